@@ -3,9 +3,12 @@ import os
 import platform
 import re
 import shutil
+import struct
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from mclogger import logger
@@ -49,6 +52,11 @@ def find_tool_in_common_locations(tool_name):
     return None
 
 
+# Our own descriptors are non-inheritable (PEP 446), so keeping close_fds off
+# costs nothing and lets CPython launch the tools with posix_spawn() instead of
+# fork()+exec()
+_SPAWN_OPTIONS = {"close_fds": False} if os.name == "posix" else {}
+
 # Global variables for tool paths and processing counters
 mkvpropedit = False
 mkvmerge = False
@@ -85,6 +93,66 @@ mp4_processing_time = 0.0
 # Global options object - will be set in main()
 options = None
 
+# Worker pool for --jobs above 1 - None means files are processed inline
+_executor = None
+_pending = []
+
+# "processed" or "errored" for each folder whose files went to the worker pool
+_folder_results = {}
+
+# Guards the counters above while files are processed on worker threads
+_stats_lock = threading.Lock()
+
+
+def _dispatch(process, file_path, folder_path=None):
+    """Process a file now, or queue it on the worker pool when one is running."""
+    if _executor is None:
+        process(file_path)
+    else:
+        _pending.append(
+            _executor.submit(_process_queued, process, file_path, folder_path)
+        )
+
+
+def _process_queued(process, file_path, folder_path):
+    """
+    Process a file on a worker thread.
+
+    A file found in a folder that raises marks that folder as errored, just as
+    process_folder() does when the same file is processed inline. Files given
+    directly still raise, as they would without a worker pool.
+    """
+    try:
+        process(file_path)
+    except Exception as e:
+        if folder_path is None:
+            raise
+        if _count_folder(folder_path, errored=True):
+            logger.error(f"Error processing folder {folder_path}: {e}")
+
+
+def _count_folder(folder_path, errored):
+    """
+    Count a folder whose files were queued as processed or errored.
+
+    Its files may still fail after process_folder() has counted it as
+    processed, so the first failure moves it over to the errored count and
+    later ones are ignored. Returns False if the folder had already errored.
+    """
+    global folders_processed, folders_errored
+    with _stats_lock:
+        previous = _folder_results.get(folder_path)
+        if previous == "errored":
+            return False
+        if errored:
+            folders_errored = folders_errored + 1
+            if previous == "processed":
+                folders_processed = folders_processed - 1
+        else:
+            folders_processed = folders_processed + 1
+        _folder_results[folder_path] = "errored" if errored else "processed"
+        return True
+
 
 def format_error_string(error_str):
     return error_str.replace("\n", "").replace("\r", "")
@@ -152,68 +220,74 @@ def process_mkv_file(file_path, track_id=1, mkvpropedit_path=None, mkvmerge_path
     metadata = get_mkv_metadata(file_path, mkvmerge_tool)
     log_mkv_metadata(metadata)
 
-    try:
-        command = [
-            mkvpropedit_tool,
-            "-q",
-            file_path,
-            "-d",
-            "title",
-            "-e",
-            f"track:v{track_id}",
-            "-d",
-            "name",
-            "-e",
-            f"track:v{track_id}",
-            "-s",
-            "language=und",
-        ]
-
-        # Only add audio track options if audio tracks exist and clearing is enabled
-        if has_audio_tracks(metadata) and options.clear_audio_track_names:
-            command.extend(["-e", f"track:a{track_id}", "-d", "name"])
-            logger.debug("Clearing audio track names")
-        elif has_audio_tracks(metadata):
-            logger.debug(
-                "Audio tracks found but clearing disabled, preserving audio track names"
-            )
-        else:
-            logger.debug("No audio tracks found, skipping audio track options")
-        if options.set_default_sub_track or options.force_default_first_subtitle:
-            command = command + get_mkv_subtitle_args(metadata)
-        if options.set_default_audio_track:
-            command = command + get_mkv_audio_args(metadata)
-        logger.debug(f"mkvpropedit command: {' '.join(command)}")
-
-        if options.dry_run:
-            logger.info("DRY RUN: Would execute mkvpropedit command")
+    command = [
+        mkvpropedit_tool,
+        "-q",
+        file_path,
+        "-d",
+        "title",
+        "-e",
+        f"track:v{track_id}",
+        "-d",
+        "name",
+        "-e",
+        f"track:v{track_id}",
+        "-s",
+        "language=und",
+    ]
+
+    # Only add audio track options if audio tracks exist and clearing is enabled
+    if has_audio_tracks(metadata) and options.clear_audio_track_names:
+        command.extend(["-e", f"track:a{track_id}", "-d", "name"])
+        logger.debug("Clearing audio track names")
+    elif has_audio_tracks(metadata):
+        logger.debug(
+            "Audio tracks found but clearing disabled, preserving audio track names"
+        )
+    else:
+        logger.debug("No audio tracks found, skipping audio track options")
+    if options.set_default_sub_track or options.force_default_first_subtitle:
+        command = command + get_mkv_subtitle_args(metadata)
+    if options.set_default_audio_track:
+        command = command + get_mkv_audio_args(metadata)
+    logger.debug(f"mkvpropedit command: {' '.join(command)}")
+
+    if options.dry_run:
+        logger.info("DRY RUN: Would execute mkvpropedit command")
+        # Track processing time even for dry run
+        mkv_duration = time.perf_counter() - mkv_start_time
+        with _stats_lock:
             files_processed = files_processed + 1
             mkv_files_processed = mkv_files_processed + 1
-            # Track processing time even for dry run
-            mkv_duration = time.perf_counter() - mkv_start_time
             mkv_processing_time = mkv_processing_time + mkv_duration
-            logger.info("Processing finished (dry run).")
-        else:
-            start_time = time.perf_counter()
-            subprocess.run(command, check=True, capture_output=True, encoding="cp437")
-            duration = time.perf_counter() - start_time
-            logger.debug(f"Command took: {duration:.3f} seconds")
+        logger.info("Processing finished (dry run).")
+    else:
+        start_time = time.perf_counter()
+        result = subprocess.run(
+            command,
+            check=False,
+            capture_output=True,
+            encoding="cp437",
+            **_SPAWN_OPTIONS,
+        )
+        duration = time.perf_counter() - start_time
+        logger.debug(f"Command took: {duration:.3f} seconds")
 
-            files_processed = files_processed + 1
+        # Track total processing time for this MKV file, failed or not
+        mkv_duration = time.perf_counter() - mkv_start_time
+        with _stats_lock:
+            if result.returncode == 0:
+                files_processed = files_processed + 1
+            else:
+                files_errored = files_errored + 1
+                files_with_errors.append(file_path)
             mkv_files_processed = mkv_files_processed + 1
-            # Track total processing time for this MKV file
-            mkv_duration = time.perf_counter() - mkv_start_time
             mkv_processing_time = mkv_processing_time + mkv_duration
-            logger.info("Processing finished.")
 
-    except subprocess.CalledProcessError as e:
-        files_errored = files_errored + 1
-        files_with_errors.append(file_path)
-        mkv_files_processed = mkv_files_processed + 1
-        # Track processing time even for failed files
-        mkv_duration = time.perf_counter() - mkv_start_time
-        mkv_processing_time = mkv_processing_time + mkv_duration
-        logger.error(f"Error processing file: {format_error_string(e.output)}")
+        if result.returncode == 0:
+            logger.info("Processing finished.")
+        else:
+            logger.error(f"Error processing file: {format_error_string(result.stdout)}")
 
 
 def process_mp4_file(file_path, atomicparsley_path=None):
@@ -239,59 +313,67 @@ def process_mp4_file(file_path, atomicparsley_path=None):
     if not metadata:
         logger.info("No metadata found in file.")
         # Still count as processed even if no metadata
-        mp4_files_processed = mp4_files_processed + 1
         mp4_duration = time.perf_counter() - mp4_start_time
-        mp4_processing_time = mp4_processing_time + mp4_duration
+        with _stats_lock:
+            mp4_files_processed = mp4_files_processed + 1
+            mp4_processing_time = mp4_processing_time + mp4_duration
         return
 
     logger.debug("Original MP4 metadata:")
     logger.debug(f"  Title: {metadata.get('title') or ''}")
     logger.debug(f"  Description: {metadata.get('description') or ''}")
 
-    try:
-        command = [
-            atomicparsley_tool,
-            file_path,
-            "--title",
-            "",
-            "--description",
-            "",
-            "--preventOptimizing",
-            "--overWrite",
-        ]
-
-        # Format command for logging, replacing empty strings with quoted empty strings
-        formatted_command = " ".join('""' if arg == "" else arg for arg in command)
-        logger.debug(f"AtomicParsley command: {formatted_command}")
-
-        if options.dry_run:
-            logger.info("DRY RUN: Would execute AtomicParsley command")
+    command = [
+        atomicparsley_tool,
+        file_path,
+        "--title",
+        "",
+        "--description",
+        "",
+        "--preventOptimizing",
+        "--overWrite",
+    ]
+
+    # Format command for logging, replacing empty strings with quoted empty strings
+    formatted_command = " ".join('""' if arg == "" else arg for arg in command)
+    logger.debug(f"AtomicParsley command: {formatted_command}")
+
+    if options.dry_run:
+        logger.info("DRY RUN: Would execute AtomicParsley command")
+        # Track processing time even for dry run
+        mp4_duration = time.perf_counter() - mp4_start_time
+        with _stats_lock:
             files_processed = files_processed + 1
             mp4_files_processed = mp4_files_processed + 1
-            # Track processing time even for dry run
-            mp4_duration = time.perf_counter() - mp4_start_time
             mp4_processing_time = mp4_processing_time + mp4_duration
-            logger.info("Processing finished (dry run).")
-        else:
-            start_time = time.perf_counter()
-            subprocess.run(command, check=True, capture_output=True, encoding="cp437")
-            duration = time.perf_counter() - start_time
-            logger.debug(f"Command took: {duration:.3f} seconds")
-            files_processed = files_processed + 1
+        logger.info("Processing finished (dry run).")
+    else:
+        start_time = time.perf_counter()
+        result = subprocess.run(
+            command,
+            check=False,
+            capture_output=True,
+            encoding="cp437",
+            **_SPAWN_OPTIONS,
+        )
+        duration = time.perf_counter() - start_time
+        logger.debug(f"Command took: {duration:.3f} seconds")
+
+        # Track total processing time for this MP4 file, failed or not
+        mp4_duration = time.perf_counter() - mp4_start_time
+        with _stats_lock:
+            if result.returncode == 0:
+                files_processed = files_processed + 1
+            else:
+                files_errored = files_errored + 1
+                files_with_errors.append(file_path)
             mp4_files_processed = mp4_files_processed + 1
-            # Track total processing time for this MP4 file
-            mp4_duration = time.perf_counter() - mp4_start_time
             mp4_processing_time = mp4_processing_time + mp4_duration
-            logger.info("Processing finished.")
 
-    except subprocess.CalledProcessError as e:
-        files_errored = files_errored + 1
-        files_with_errors.append(file_path)
-        mp4_files_processed = mp4_files_processed + 1
-        # Track processing time even for failed files
-        mp4_duration = time.perf_counter() - mp4_start_time
-        mp4_processing_time = mp4_processing_time + mp4_duration
-        logger.error(f"Error processing file: {format_error_string(e.output)}")
+        if result.returncode == 0:
+            logger.info("Processing finished.")
+        else:
+            logger.error(f"Error processing file: {format_error_string(result.stdout)}")
 
 
 def process_folder(folder_path):
@@ -300,12 +382,14 @@ def process_folder(folder_path):
 
     # Check if folder exists first
     if not Path(folder_path).exists():
-        folders_errored = folders_errored + 1
+        with _stats_lock:
+            folders_errored = folders_errored + 1
         logger.error(f"Folder does not exist: {folder_path}")
         return
 
     if not Path(folder_path).is_dir():
-        folders_errored = folders_errored + 1
+        with _stats_lock:
+            folders_errored = folders_errored + 1
         logger.error(f"Path is not a directory: {folder_path}")
         return
 
@@ -315,16 +399,22 @@ def process_folder(folder_path):
                 if file.endswith(".mkv"):
                     if not options.only_mp4:  # Process MKV unless only MP4 is enabled
                         file_path = str(Path(root) / file)
-                        process_mkv_file(file_path)
+                        _dispatch(process_mkv_file, file_path, folder_path)
                 elif file.endswith((".mp4", ".m4v", ".mp4v")):
                     if not options.only_mkv:  # Process MP4 unless only MKV is enabled
                         file_path = str(Path(root) / file)
-                        process_mp4_file(file_path)
+                        _dispatch(process_mp4_file, file_path, folder_path)
 
-        folders_processed = folders_processed + 1
+        if _executor is None:
+            folders_processed = folders_processed + 1
+        else:
+            _count_folder(folder_path, errored=False)
 
     except Exception as e:
-        folders_errored = folders_errored + 1
+        if _executor is None:
+            folders_errored = folders_errored + 1
+        elif not _count_folder(folder_path, errored=True):
+            return
         logger.error(f"Error processing folder {folder_path}: {e}")
 
 
@@ -339,6 +429,7 @@ def get_tool_version(tool_path, version_arg="--version"):
             capture_output=True,
             text=True,
             timeout=5,
+            **_SPAWN_OPTIONS,
         )
 
         # Extract version from output
@@ -359,23 +450,116 @@ def get_tool_version(tool_path, version_arg="--version"):
         return None
 
 
+# Every Matroska/WebM file starts with the EBML header element ID
+_EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+
+def _read_file_header(file_path, size=8):
+    """Return the first bytes of a file, or None if it cannot be read."""
+    try:
+        with Path(file_path).open("rb") as f:
+            return f.read(size)
+    except OSError:
+        return None
+
+
+# Atom path to the iTunes-style metadata list, and the items in it that
+# AtomicParsley reports as the title and description
+_MP4_METADATA_PATH = (b"moov", b"udta", b"meta", b"ilst")
+_MP4_METADATA_ITEMS = (b"\xa9nam", b"desc")
+
+
+def _find_mp4_atom(f, start, end, kind):
+    """
+    Find the first atom of a given kind among the atoms between two offsets.
+
+    Returns the (start, end) offsets of its contents, or None if there is no
+    such atom. Raises ValueError for atom sizes that do not fit the range.
+    """
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("Truncated atom header")
+        size, atom_kind = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            # 64-bit size stored right after the type
+            largesize = f.read(8)
+            if len(largesize) < 8:
+                raise ValueError("Truncated atom header")
+            size = struct.unpack(">Q", largesize)[0]
+            header_size = 16
+        elif size == 0:
+            # The atom extends to the end of its parent
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise ValueError(f"Invalid size for {atom_kind!r} atom")
+        if atom_kind == kind:
+            return offset + header_size, offset + size
+        offset += size
+    return None
+
+
+def _mp4_has_title_or_description(file_path):
+    """
+    Check whether an MP4 file has a title or description metadata item.
+
+    Returns None if the atom tree cannot be read, leaving the decision to
+    AtomicParsley.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            start, end = 0, f.seek(0, os.SEEK_END)
+            for kind in _MP4_METADATA_PATH:
+                found = _find_mp4_atom(f, start, end, kind)
+                if found is None:
+                    return False
+                start, end = found
+                if kind == b"meta":
+                    # ISO meta atoms start with version and flags (all zero),
+                    # QuickTime ones go straight to their first child
+                    f.seek(start)
+                    if f.read(4) == b"\0\0\0\0":
+                        start += 4
+            return any(
+                _find_mp4_atom(f, start, end, item) is not None
+                for item in _MP4_METADATA_ITEMS
+            )
+    except (OSError, ValueError):
+        return None
+
+
 def get_mkv_metadata(file_path, mkvmerge_path=None):
     # Use provided path or fall back to global variable
     tool_path = mkvmerge_path or mkvmerge
     if not tool_path:
         raise RuntimeError("mkvmerge tool not available")
 
+    # Files that cannot be Matroska are answered the way mkvmerge would answer
+    # them, without starting it; unreadable files are left for mkvmerge to report
+    header = _read_file_header(file_path)
+    if header is not None and not header.startswith(_EBML_MAGIC):
+        logger.debug(f"No EBML header in {file_path}, not a Matroska file")
+        return {"container": {"recognized": False, "supported": False}, "tracks": []}
+
     command = [tool_path, "-J", file_path]
     logger.debug(f"mkvmerge command: {' '.join(command)}")
 
     try:
         start_time = time.perf_counter()
+        # mkvmerge -J reports errors as JSON on stdout too, so stderr is not
+        # needed - with a single pipe communicate() reads it without threads
         result = subprocess.run(
             command,
-            capture_output=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
             check=True,
             encoding="cp437",  # https://stackoverflow.com/a/73546303
+            **_SPAWN_OPTIONS,
         )
         duration = time.perf_counter() - start_time
         logger.debug(f"Metadata collection took: {duration:.3f} seconds")
@@ -399,13 +583,24 @@ def get_mp4_metadata(file_path, atomicparsley_path=None):
     if not tool_path:
         raise RuntimeError("AtomicParsley tool not available")
 
+    # Only run AtomicParsley when there is a title or description for it to read
+    if _mp4_has_title_or_description(file_path) is False:
+        logger.debug(f"No title or description atoms in {file_path}")
+        return {"title": None, "description": None}
+
     command = [tool_path, file_path, "-t"]
     logger.debug(f"AtomicParsley command: {' '.join(command)}")
 
     try:
         start_time = time.perf_counter()
         result = subprocess.run(
-            command, capture_output=True, text=True, check=True, encoding="utf-8"
+            command,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            check=True,
+            encoding="utf-8",
+            **_SPAWN_OPTIONS,
         )
         duration = time.perf_counter() - start_time
         logger.debug(f"Metadata collection took: {duration:.3f} seconds")
@@ -596,7 +791,7 @@ def read_paths_from_file(input_file):
 
 
 def main():
-    global mkvpropedit, mkvmerge, atomicparsley, options
+    global mkvpropedit, mkvmerge, atomicparsley, options, _executor
     global files_processed, files_errored, folders_processed, folders_errored, files_with_errors
     global mkv_files_processed, mp4_files_processed, mkv_processing_time, mp4_processing_time
 
@@ -737,6 +932,7 @@ def main():
     )
     logger.debug(f"  dryRun: {options.dry_run} - {options.sources['dry_run']}")
     logger.debug(f"  logLevel: {options.log_level} - {options.sources['log_level']}")
+    logger.debug(f"  jobs: {options.jobs} - {options.sources['jobs']}")
 
     # Use direct binary paths or fallback to system PATH
     if options.mkvpropedit_path:
@@ -769,43 +965,67 @@ def main():
         logger.critical("neither mkvtoolnix nor AtomicParsley found in PATH. Exiting.")
         sys.exit()
 
+    # Ask the tools for their versions concurrently - each probe is a process
+    # start, so this takes as long as the slowest tool rather than all three
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        mkvpropedit_version, mkvmerge_version, atomicparsley_version = pool.map(
+            get_tool_version, (mkvpropedit, mkvmerge, atomicparsley)
+        )
+
     # Log tool discovery with sources
     logger.debug("Tool discovery:")
     if mkvpropedit:
         tool_source = "direct path" if options.mkvpropedit_path else "PATH"
         logger.debug(f"  mkvpropedit: {mkvpropedit} - {tool_source}")
-        version = get_tool_version(mkvpropedit)
-        if version:
-            logger.info(f"mkvpropedit version: {version}")
+        if mkvpropedit_version:
+            logger.info(f"mkvpropedit version: {mkvpropedit_version}")
     else:
         logger.debug("  mkvpropedit: not found")
 
     if mkvmerge:
         tool_source = "direct path" if options.mkvmerge_path else "PATH"
         logger.debug(f"  mkvmerge: {mkvmerge} - {tool_source}")
-        version = get_tool_version(mkvmerge)
-        if version:
-            logger.info(f"mkvmerge version: {version}")
+        if mkvmerge_version:
+            logger.info(f"mkvmerge version: {mkvmerge_version}")
     else:
         logger.debug("  mkvmerge: not found")
 
     if atomicparsley:
         tool_source = "direct path" if options.atomicparsley_path else "PATH"
         logger.debug(f"  AtomicParsley: {atomicparsley} - {tool_source}")
-        version = get_tool_version(atomicparsley)
-        if version:
-            logger.info(f"{version}")
+        if atomicparsley_version:
+            logger.info(f"{atomicparsley_version}")
     else:
         logger.debug("  AtomicParsley: not found")
 
-    for path in all_paths:
-        if Path(path).is_file():
-            if path.lower().endswith(".mkv"):
-                process_mkv_file(path)
-            elif path.lower().endswith(".mp4") or path.lower().endswith(".m4v"):
-                process_mp4_file(path)
-        elif Path(path).is_dir():
-            process_folder(path)
+    # Files are independent, so with --jobs above 1 they run on a thread pool;
+    # the work itself happens in the external tools, outside the GIL
+    if options.jobs > 1:
+        _executor = ThreadPoolExecutor(max_workers=options.jobs)
+
+    try:
+        for path in all_paths:
+            if Path(path).is_file():
+                if path.lower().endswith(".mkv"):
+                    _dispatch(process_mkv_file, path)
+                elif path.lower().endswith(".mp4") or path.lower().endswith(".m4v"):
+                    _dispatch(process_mp4_file, path)
+            elif Path(path).is_dir():
+                process_folder(path)
+
+        for future in _pending:
+            future.result()
+    except BaseException:
+        # Ctrl+C or a failed file: drop the queued files rather than wait on them
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+            _pending.clear()
+            _folder_results.clear()
 
     logger.info(f"Total folders processed: {folders_processed}")
     if folders_errored:
@@ -14,8 +14,18 @@ except ModuleNotFoundError:
 import tomli_w  # pip install tomli-w
 
 
+def _load_example_template():
+    """Return the example config file contents, or None if it is missing."""
+    # Find the example config file relative to this module
+    example_config_path = Path(__file__).parent / "config.example.toml"
+    try:
+        return example_config_path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
 class Config:
-    def __init__(self, filename, custom_config_path=None):
+    def __init__(self, filename, custom_config_path=None, config_text=None):
         self.config = {
             "logLevel": 20,
             "mkvmergePath": "",
@@ -32,7 +42,12 @@ class Config:
             "stdoutOnly": False,
         }
 
-        if custom_config_path:
+        if config_text is not None:
+            # Config supplied directly as TOML text - no files are read or created
+            self.config_path = ""
+            self.config_file_path = "<config text>"
+            self.log_file_path = ""
+        elif custom_config_path:
             # Use custom config file path directly
             self.config_file_path = custom_config_path
             # For custom config, use same directory for log file
@@ -45,15 +60,20 @@ class Config:
             self.log_file_path = str(Path(self.config_path) / f"{__app_name__}.log")
             self._ensure_config_exists(self.config_path, self.config_file_path)
 
-        # Load the config file if it exists
-        if Path(self.config_file_path).is_file():
+        # Load the config text, or the config file if it exists
+        if config_text is not None or Path(self.config_file_path).is_file():
+            config_type = (
+                "custom" if custom_config_path or config_text is not None else "default"
+            )
             try:
-                with Path(self.config_file_path).open("rb") as config_file:
-                    loaded_config = tomllib.load(config_file)
-                    # Merge loaded config with defaults (loaded values override defaults)
-                    self.config.update(loaded_config)
+                if config_text is not None:
+                    loaded_config = tomllib.loads(config_text)
+                else:
+                    with Path(self.config_file_path).open("rb") as config_file:
+                        loaded_config = tomllib.load(config_file)
+                # Merge loaded config with defaults (loaded values override defaults)
+                self.config.update(loaded_config)
             except tomllib.TOMLDecodeError as e:
-                config_type = "custom" if custom_config_path else "default"
                 print(
                     f"Error: Invalid TOML syntax in {config_type} configuration file:",
                     file=sys.stderr,
@@ -70,7 +90,6 @@ class Config:
                 )
                 sys.exit(1)
             except PermissionError:
-                config_type = "custom" if custom_config_path else "default"
                 print(
                     f"Error: Permission denied reading {config_type} configuration file:",
                     file=sys.stderr,
@@ -79,7 +98,6 @@ class Config:
                 print("Please check file permissions.", file=sys.stderr)
                 sys.exit(1)
             except Exception as e:
-                config_type = "custom" if custom_config_path else "default"
                 print(
                     f"Error: Failed to read {config_type} configuration file:",
                     file=sys.stderr,
@@ -112,20 +130,16 @@ class Config:
 
     def _generate_default_config_file(self, config_file_path):
         # Copy example config file instead of generating from scratch
-        import shutil
-        from pathlib import Path
+        example_config = _load_example_template()
 
-        # Find the example config file relative to this module
-        current_dir = Path(__file__).parent
-        example_config_path = current_dir / "config.example.toml"
-
-        if example_config_path.exists():
+        if example_config is not None:
             # Copy the example config file
-            shutil.copy2(example_config_path, config_file_path)
+            Path(config_file_path).write_bytes(example_config)
         else:
             # Fallback to old behavior if example file not found
-            with Path(config_file_path).open("wb") as f:
-                f.write(tomli_w.dumps(self.config).encode("utf-8"))
+            Path(config_file_path).write_bytes(
+                tomli_w.dumps(self.config).encode("utf-8")
+            )
 
     def _ensure_config_exists(self, config_dir, config_file_path):
         Path(config_dir).mkdir(parents=True, exist_ok=True)
@@ -135,15 +149,23 @@ class Config:
     def get(self, key, default=None):
         return self.config.get(key, default)
 
+    def __contains__(self, key):
+        return key in self.config
+
 
 # Default global config instance - will be updated if custom config is provided
 mcconfig = None
 
 
-def initialize_config(custom_config_path=None):
-    """Initialize the global config instance with optional custom config path."""
+def initialize_config(custom_config_path=None, config_text=None):
+    """
+    Initialize the global config instance with optional custom config path.
+
+    If config_text is given it is parsed as TOML directly and no config file is
+    looked up, created or read.
+    """
     global mcconfig
-    mcconfig = Config("config.toml", custom_config_path)
+    mcconfig = Config("config.toml", custom_config_path, config_text)
     return mcconfig
 
 
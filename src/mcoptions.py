@@ -85,7 +85,11 @@ def get_system_locale():
     return None
 
 
-@dataclass
+# slots=True needs Python 3.10+; older interpreters fall back to a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Options:
     """Container for all parsed options and configuration values."""
 
@@ -117,6 +121,7 @@ class Options:
     force_default_first_subtitle: bool
     set_default_audio_track: bool
     clear_audio_track_names: bool
+    jobs: int
 
     # Source tracking - maps option name to source
     sources: dict[str, str]
@@ -225,6 +230,13 @@ def _create_argument_parser() -> argparse.ArgumentParser:
         help="Override setDefaultAudio - enable default audio track setting",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Override jobs - number of files to process in parallel",
+    )
+
     parser.add_argument(
         "-c",
         "--config",
@@ -299,7 +311,9 @@ def _setup_language_config() -> tuple[str, Language, str, bool, Optional[str]]:
     return language, lang_object, lang3, use_system_locale, detected_locale
 
 
-def _validate_options(args: argparse.Namespace, only_mkv: bool, only_mp4: bool) -> None:
+def _validate_options(
+    args: argparse.Namespace, only_mkv: bool, only_mp4: bool, jobs: int = 1
+) -> None:
     """Validate parsed options and exit with error if invalid."""
 
     # Validate arguments - must have either paths or input file
@@ -316,6 +330,12 @@ def _validate_options(args: argparse.Namespace, only_mkv: bool, only_mp4: bool)
         )
         sys.exit(1)
 
+    # Validate that at least one file can be processed at a time; bool is an
+    # int subclass, so a TOML "jobs = true" has to be rejected explicitly
+    if isinstance(jobs, bool) or not isinstance(jobs, int) or jobs < 1:
+        logger.critical(f"jobs must be a whole number of at least 1, got {jobs!r}")
+        sys.exit(1)
+
 
 def parse_options() -> Options:
     """
@@ -516,8 +536,20 @@ def parse_options() -> Options:
         set_default_audio_track = False
         sources["set_default_audio_track"] = "default"
 
+    # Number of files processed in parallel
+    if args.jobs is not None:
+        jobs = args.jobs
+        sources["jobs"] = "cli"
+    elif mcconfig and "jobs" in mcconfig:
+        # Any configured value, even 0, goes through _validate_options
+        jobs = mcconfig.get("jobs")
+        sources["jobs"] = "config"
+    else:
+        jobs = 1
+        sources["jobs"] = "default"
+
     # Validate options
-    _validate_options(args, only_mkv, only_mp4)
+    _validate_options(args, only_mkv, only_mp4, jobs)
 
     # Create and return options object
     return Options(
@@ -546,6 +578,7 @@ def parse_options() -> Options:
         force_default_first_subtitle=force_default_first_subtitle,
         set_default_audio_track=set_default_audio_track,
         clear_audio_track_names=clear_audio_track_names,
+        jobs=jobs,
         # Source tracking
         sources=sources,
     )
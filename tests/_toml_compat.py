@@ -0,0 +1,12 @@
+"""
+Shared tomllib/tomli import for tests
+"""
+
+try:
+    import tomllib  # Python 3.11+
+except ModuleNotFoundError:
+    import tomli as tomllib  # type: ignore[no-redef]
+
+TOMLDecodeError = tomllib.TOMLDecodeError
+
+__all__ = ["TOMLDecodeError", "tomllib"]
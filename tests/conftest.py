@@ -3,6 +3,7 @@ Pytest configuration and shared fixtures
 """
 
 import shutil
+import subprocess
 import sys
 import tempfile
 from pathlib import Path
@@ -21,6 +22,79 @@ def temp_dir():
     shutil.rmtree(temp_dir)
 
 
+@pytest.fixture(scope="session")
+def dummy_mkv(tmp_path_factory):
+    """Path to a placeholder .mkv file shared by the whole test session"""
+    path = tmp_path_factory.mktemp("media") / "dummy.mkv"
+    path.write_bytes(b"fake mkv content")
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def dummy_mp4(tmp_path_factory):
+    """Path to a placeholder .mp4 file shared by the whole test session"""
+    path = tmp_path_factory.mktemp("media") / "dummy.mp4"
+    path.write_bytes(b"fake mp4 content")
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def install_script():
+    """Path to the install script at the repository root"""
+    return Path(__file__).parent.parent / "install"
+
+
+@pytest.fixture(scope="session")
+def uninstall_script():
+    """Path to the uninstall script at the repository root"""
+    return Path(__file__).parent.parent / "uninstall"
+
+
+def _cached_script_runner(script):
+    """Return a function that runs script with args once and caches the result"""
+    results = {}
+
+    def run(*args):
+        if args not in results:
+            # -I skips user site-packages and PYTHON* variables; -S is not
+            # usable because the scripts import tomli-w through mcconfig
+            results[args] = subprocess.run(
+                [sys.executable, "-I", str(script), *args],
+                check=False,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                errors="replace",
+            )
+        return results[args]
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def run_install(install_script):
+    """Run the install script, sharing the result of identical invocations"""
+    return _cached_script_runner(install_script)
+
+
+@pytest.fixture(scope="session")
+def run_uninstall(uninstall_script):
+    """Run the uninstall script, sharing the result of identical invocations"""
+    return _cached_script_runner(uninstall_script)
+
+
+@pytest.fixture(scope="session")
+def install_script_text(install_script):
+    """Contents of the install script, read once per session"""
+    return install_script.read_text()
+
+
+@pytest.fixture(scope="session")
+def uninstall_script_text(uninstall_script):
+    """Contents of the uninstall script, read once per session"""
+    return uninstall_script.read_text()
+
+
 @pytest.fixture
 def test_files_dir():
     """Path to the test files directory"""
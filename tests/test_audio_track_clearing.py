@@ -4,7 +4,7 @@ Tests for audio track name clearing functionality
 
 import tempfile
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from src.main import has_audio_tracks, process_mkv_file
 from version import __app_name__
@@ -37,7 +37,7 @@ class TestAudioTrackClearing:
                         ]
                     }
 
-                    with patch("src.main.subprocess.run"), patch("src.main.logger") as mock_logger:
+                    with patch("src.main.subprocess.run", return_value=MagicMock(returncode=0)), patch("src.main.logger") as mock_logger:
                             # Call the function
                             process_mkv_file(
                                 tmp_file_path,
@@ -80,7 +80,7 @@ class TestAudioTrackClearing:
                         ]
                     }
 
-                    with patch("src.main.subprocess.run"), patch("src.main.logger") as mock_logger:
+                    with patch("src.main.subprocess.run", return_value=MagicMock(returncode=0)), patch("src.main.logger") as mock_logger:
                             # Call the function
                             process_mkv_file(
                                 tmp_file_path,
@@ -123,7 +123,7 @@ class TestAudioTrackClearing:
                         ]
                     }
 
-                    with patch("src.main.subprocess.run"), patch("src.main.logger") as mock_logger:
+                    with patch("src.main.subprocess.run", return_value=MagicMock(returncode=0)), patch("src.main.logger") as mock_logger:
                             # Call the function
                             process_mkv_file(
                                 tmp_file_path,
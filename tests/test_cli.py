@@ -172,6 +172,16 @@ class TestValidateOptions:
         with pytest.raises(SystemExit):
             _validate_options(args, True, True)  # Both only_mkv and only_mp4
 
+    @pytest.mark.parametrize("jobs", [0, -1, "4"])
+    def test_validate_options_invalid_jobs(self, jobs):
+        """Test validation failure when jobs is not a positive whole number"""
+        args = MagicMock()
+        args.paths = ["test.mkv"]
+        args.input = None
+
+        with pytest.raises(SystemExit):
+            _validate_options(args, False, False, jobs)
+
 
 class TestFullCLIIntegration:
     """Test full CLI integration"""
@@ -270,16 +280,15 @@ class TestFullCLIIntegration:
             # Create a custom config file
 
             custom_config_path = Path(temp_dir) / "integration_test.toml"
-            with custom_config_path.open("w") as f:
-                f.write(
-                    """
+            custom_config_path.write_text(
+                """
 logLevel = 50
 language = "ja"
 useSystemLocale = false
 setDefaultSubtitle = true
 onlyMkv = true
 """
-                )
+            )
 
             # Test custom config loading
             config = initialize_config(custom_config_path)
@@ -191,8 +191,7 @@ class TestCLIIntegration:
         # Create a temporary directory with a test file
         with tempfile.TemporaryDirectory() as tmp_dir:
             test_file = str(Path(tmp_dir) / "test.mkv")
-            with Path(test_file).open("w") as f:
-                f.write("fake content")
+            Path(test_file).write_text("fake content")
 
             # Mock sys.argv to simulate CLI execution with folder
             with patch("sys.argv", [__app_name__, tmp_dir]):
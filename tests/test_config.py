@@ -2,17 +2,66 @@
 Unit tests for configuration system (mcconfig.py and mcoptions.py)
 """
 
+import dataclasses
+import logging
 import os
 import tempfile
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+import tomli_w
+from langcodes import Language
 
 from mcconfig import Config, initialize_config
 from mcoptions import Options, get_system_locale, parse_options
 from version import __app_name__
 
+# Config values served by the stand-in config used in TestParseOptions
+PARSE_OPTIONS_CONFIG = {
+    "useSystemLocale": True,
+    "language": "en",
+    "logLevel": 20,
+    "setDefaultSubtitle": False,
+    "forceDefaultFirstSubtitle": False,
+    "onlyMkv": False,
+    "onlyMp4": False,
+    "mkvmergePath": "",
+    "mkvpropeditPath": "",
+    "atomicParsleyPath": "",
+}
+
+
+def make_options(**overrides):
+    """Build a fresh Options with baseline values, applying overrides"""
+    values = {
+        "paths": [],
+        "input_file": None,
+        "dry_run": False,
+        "only_mkv": False,
+        "only_mp4": False,
+        "language": "en",
+        "lang_object": Language.get("en"),
+        "lang3": "eng",
+        "use_system_locale": True,
+        "detected_locale": None,
+        "mkvmerge_path": "",
+        "mkvpropedit_path": "",
+        "atomicparsley_path": "",
+        "log_level": logging.INFO,
+        "log_file_path": "",
+        "stdout": False,
+        "stdout_only": False,
+        "set_default_sub_track": False,
+        "force_default_first_subtitle": False,
+        "set_default_audio_track": False,
+        "clear_audio_track_names": False,
+        "jobs": 1,
+        "sources": {},
+    }
+    values.update(overrides)
+    return Options(**values)
+
 
 class TestConfig:
     """Test the Config class"""
@@ -20,10 +69,7 @@ class TestConfig:
     def test_tomllib_import_fallback(self):
         """Test fallback to tomli when tomllib is not available"""
         # This test verifies the import fallback works by checking both modules exist
-        try:
-            import tomllib
-        except ModuleNotFoundError:
-            import tomli as tomllib
+        from ._toml_compat import tomllib
 
         # Just verify we can access the load function from whichever module is used
         assert hasattr(tomllib, "load")
@@ -92,49 +138,54 @@ class TestConfig:
                     assert "onlyMkv = false" in content
                     assert "onlyMp4 = false" in content
 
-    def test_config_file_fallback_when_example_missing(self):
-        """Test fallback to old behavior when example config file is missing"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create a config instance and test _generate_default_config_file directly
-            config = Config.__new__(Config)
-            config.config = {
-                "logLevel": 20,
-                "mkvmergePath": "",
-                "useSystemLocale": True,
-            }
+    def test_config_from_text(self):
+        """Test that config text is parsed without touching any config file"""
+        with patch("mcconfig.Config._get_config_path") as mock_get_config_path:
+            config = Config(
+                "test_config.toml", config_text='logLevel = 10\nlanguage = "fr"\n'
+            )
+
+            mock_get_config_path.assert_not_called()
+            assert config.get("logLevel") == 10
+            assert config.get("language") == "fr"
+            assert config.get("useSystemLocale") is True  # default preserved
+
+    def test_config_contains_only_set_keys(self):
+        """Test membership reports keys from the defaults and the config text"""
+        config = Config("test_config.toml", config_text="jobs = 0\n")
 
-            config_file_path = str(Path(temp_dir) / "test_config.toml")
+        assert "jobs" in config
+        assert "logLevel" in config
+        assert "notAnOption" not in config
 
-            # Test the fallback behavior by temporarily moving the example file
-            import shutil
+    def test_config_file_fallback_when_example_missing(self, tmp_path, monkeypatch):
+        """Test fallback to old behavior when example config file is missing"""
+        # Pretend the example file is missing without touching the source tree
+        monkeypatch.setattr("mcconfig._load_example_template", lambda: None)
 
-            # Find the real example file and temporarily rename it
-            example_path = Path(__file__).parent.parent / "src" / "config.example.toml"
-            backup_path = example_path.with_suffix(".toml.backup")
+        # Create a config instance and test _generate_default_config_file directly
+        config = Config.__new__(Config)
+        config.config = {
+            "logLevel": 20,
+            "mkvmergePath": "",
+            "useSystemLocale": True,
+        }
 
-            try:
-                # Temporarily rename the example file so it's not found
-                if example_path.exists():
-                    shutil.move(str(example_path), str(backup_path))
+        config_file_path = tmp_path / "test_config.toml"
 
-                # Call the method - should fallback to old behavior
-                config._generate_default_config_file(config_file_path)
+        # Call the method - should fallback to old behavior
+        config._generate_default_config_file(str(config_file_path))
 
-                assert Path(config_file_path).exists()
+        assert config_file_path.exists()
 
-                # Read the generated file and verify it contains minimal content (no comments)
-                with Path(config_file_path).open() as f:
-                    content = f.read()
-                    # Should not contain example file comments
-                    assert "# Copy this file to your local config folder" not in content
-                    assert "# Log level as an integer" not in content
-                    # Should contain the basic values
-                    assert "logLevel = 20" in content
-                    assert "useSystemLocale = true" in content
-            finally:
-                # Restore the example file
-                if backup_path.exists():
-                    shutil.move(str(backup_path), str(example_path))
+        # Read the generated file and verify it contains minimal content (no comments)
+        content = config_file_path.read_text()
+        # Should not contain example file comments
+        assert "# Copy this file to your local config folder" not in content
+        assert "# Log level as an integer" not in content
+        # Should contain the basic values
+        assert "logLevel = 20" in content
+        assert "useSystemLocale = true" in content
 
     @patch("mcconfig.platform.system")
     def test_get_config_path_windows(self, mock_system):
@@ -237,8 +288,9 @@ class TestGetSystemLocale:
         """Test system locale fallback to Python's locale"""
         mock_system.return_value = "Linux"
 
-        with patch.dict(os.environ, {}, clear=True), patch(
-            "mcoptions.locale.getdefaultlocale", return_value=("es_ES", "UTF-8")
+        with (
+            patch.dict(os.environ, {}, clear=True),
+            patch("mcoptions.locale.getdefaultlocale", return_value=("es_ES", "UTF-8")),
         ):
             result = get_system_locale()
 
@@ -249,54 +301,62 @@ class TestGetSystemLocale:
         """Test system locale detection failure"""
         mock_system.return_value = "Linux"
 
-        with patch.dict(os.environ, {}, clear=True), patch(
-            "mcoptions.locale.getdefaultlocale",
-            side_effect=Exception("Locale error"),
+        with (
+            patch.dict(os.environ, {}, clear=True),
+            patch(
+                "mcoptions.locale.getdefaultlocale",
+                side_effect=Exception("Locale error"),
+            ),
         ):
             result = get_system_locale()
 
             assert result is None
 
 
+class StubConfig:
+    """Stand-in for mcconfig.Config answering get() and `in` from a dict"""
+
+    log_file_path = "/tmp/test.log"
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.values
+
+
 class TestParseOptions:
     """Test the parse_options function"""
 
-    @patch("mcoptions.mcconfig")
+    @pytest.fixture(autouse=True)
+    def _patch_mcconfig(self, monkeypatch):
+        """Replace the global config and locale detection for every test"""
+        config = StubConfig(PARSE_OPTIONS_CONFIG)
+        monkeypatch.setattr("mcoptions.mcconfig", config)
+        monkeypatch.setattr("mcoptions.get_system_locale", lambda: "en")
+        self.mock_config = config
+
     @patch("sys.argv", [__app_name__, "test.mkv"])
-    def test_parse_options_defaults(self, mock_config):
+    def test_parse_options_defaults(self):
         """Test parsing with default values"""
-        mock_config.get.side_effect = lambda key, default=None: {
-            "useSystemLocale": True,
-            "language": "en",
-            "logLevel": 20,
-            "setDefaultSubtitle": False,
-            "forceDefaultFirstSubtitle": False,
-            "onlyMkv": False,
-            "onlyMp4": False,
-            "mkvmergePath": "",
-            "mkvpropeditPath": "",
-            "atomicParsleyPath": "",
-        }.get(key, default)
-        mock_config.log_file_path = "/tmp/test.log"
-
-        with patch("mcoptions.get_system_locale", return_value="en"):
-            options = parse_options()
-
-            assert options.paths == ["test.mkv"]
-            assert options.language == "en"
-            assert options.log_level == 20
-            assert options.dry_run is False
-            assert options.only_mkv is False
-            assert options.only_mp4 is False
-
-    @patch("mcoptions.mcconfig")
+        options = parse_options()
+
+        assert options.paths == ["test.mkv"]
+        assert options.language == "en"
+        assert options.log_level == 20
+        assert options.dry_run is False
+        assert options.only_mkv is False
+        assert options.only_mp4 is False
+
     @patch(
         "sys.argv", [__app_name__, "--dry-run", "--only-mkv", "-L", "es", "test.mkv"]
     )
-    def test_parse_options_cli_overrides(self, mock_config):
+    def test_parse_options_cli_overrides(self):
         """Test CLI argument overrides"""
-        mock_config.get.return_value = ""
-        mock_config.log_file_path = "/tmp/test.log"
+        self.mock_config.get = lambda key, default=None: ""
 
         options = parse_options()
 
@@ -307,39 +367,18 @@ class TestParseOptions:
         assert options.sources["only_mkv"] == "cli"
         assert options.sources["language"] == "cli"
 
-    @patch("mcoptions.mcconfig")
     @patch("sys.argv", [__app_name__, "--only-mkv", "--only-mp4", "test.mkv"])
-    def test_parse_options_conflicting_file_types(self, mock_config):
+    def test_parse_options_conflicting_file_types(self):
         """Test validation of conflicting file type options"""
-
-        def mock_get(key, default=None):
-            if key == "language":
-                return "en"
-            return ""
-
-        mock_config.get.side_effect = mock_get
-        mock_config.log_file_path = "/tmp/test.log"
-
         with pytest.raises(SystemExit):
             parse_options()
 
-    @patch("mcoptions.mcconfig")
     @patch("sys.argv", [__app_name__])
-    def test_parse_options_no_paths(self, mock_config):
+    def test_parse_options_no_paths(self):
         """Test validation when no paths are provided"""
-
-        def mock_get(key, default=None):
-            if key == "language":
-                return "en"
-            return ""
-
-        mock_config.get.side_effect = mock_get
-        mock_config.log_file_path = "/tmp/test.log"
-
         with pytest.raises(SystemExit):
             parse_options()
 
-    @patch("mcoptions.mcconfig")
     @patch(
         "sys.argv",
         [
@@ -351,62 +390,64 @@ class TestParseOptions:
             "test.mkv",
         ],
     )
-    def test_parse_options_tool_paths(self, mock_config):
+    def test_parse_options_tool_paths(self):
         """Test parsing tool path options"""
+        options = parse_options()
 
-        def mock_get(key, default=None):
-            if key == "language":
-                return "en"
-            return ""
-
-        mock_config.get.side_effect = mock_get
-        mock_config.log_file_path = "/tmp/test.log"
-
-        with patch("mcoptions.get_system_locale", return_value="en"):
-            options = parse_options()
-
-            assert options.mkvmerge_path == "/usr/bin/mkvmerge"
-            assert options.mkvpropedit_path == "/usr/bin/mkvpropedit"
-            assert options.sources["mkvmerge_path"] == "cli"
-            assert options.sources["mkvpropedit_path"] == "cli"
+        assert options.mkvmerge_path == "/usr/bin/mkvmerge"
+        assert options.mkvpropedit_path == "/usr/bin/mkvpropedit"
+        assert options.sources["mkvmerge_path"] == "cli"
+        assert options.sources["mkvpropedit_path"] == "cli"
 
-    @patch("mcoptions.mcconfig")
     @patch("sys.argv", [__app_name__, "-l", "/tmp/custom.log", "test.mkv"])
-    def test_parse_options_custom_log_file(self, mock_config):
+    def test_parse_options_custom_log_file(self):
         """Test parsing custom log file option"""
+        options = parse_options()
 
-        def mock_get(key, default=None):
-            if key == "language":
-                return "en"
-            return ""
+        assert options.log_file_path == "/tmp/custom.log"
+        assert options.sources["log_file_path"] == "cli"
 
-        mock_config.get.side_effect = mock_get
-        mock_config.log_file_path = "/tmp/test.log"
+    @patch("sys.argv", [__app_name__, "-i", "input.txt"])
+    def test_parse_options_input_file(self):
+        """Test parsing input file option"""
+        options = parse_options()
 
-        with patch("mcoptions.get_system_locale", return_value="en"):
-            options = parse_options()
+        assert options.input_file == "input.txt"
+        assert options.sources["input_file"] == "cli"
 
-            assert options.log_file_path == "/tmp/custom.log"
-            assert options.sources["log_file_path"] == "cli"
+    @patch("sys.argv", [__app_name__, "-j", "4", "test.mkv"])
+    def test_parse_options_jobs_cli(self):
+        """Test parsing the parallel jobs option"""
+        options = parse_options()
 
-    @patch("mcoptions.mcconfig")
-    @patch("sys.argv", [__app_name__, "-i", "input.txt"])
-    def test_parse_options_input_file(self, mock_config):
-        """Test parsing input file option"""
+        assert options.jobs == 4
+        assert options.sources["jobs"] == "cli"
 
-        def mock_get(key, default=None):
-            if key == "language":
-                return "en"
-            return ""
+    @patch("sys.argv", [__app_name__, "test.mkv"])
+    def test_parse_options_jobs_config(self):
+        """Test jobs read from config, defaulting to serial processing"""
+        assert parse_options().jobs == 1
 
-        mock_config.get.side_effect = mock_get
-        mock_config.log_file_path = "/tmp/test.log"
+        self.mock_config.values = {**PARSE_OPTIONS_CONFIG, "jobs": 3}
+        options = parse_options()
 
-        with patch("mcoptions.get_system_locale", return_value="en"):
-            options = parse_options()
+        assert options.jobs == 3
+        assert options.sources["jobs"] == "config"
 
-            assert options.input_file == "input.txt"
-            assert options.sources["input_file"] == "cli"
+    @patch("sys.argv", [__app_name__, "--jobs", "0", "test.mkv"])
+    def test_parse_options_invalid_jobs(self):
+        """Test validation of the jobs option"""
+        with pytest.raises(SystemExit):
+            parse_options()
+
+    @pytest.mark.parametrize("jobs", [0, True])
+    @patch("sys.argv", [__app_name__, "test.mkv"])
+    def test_parse_options_invalid_jobs_config(self, jobs):
+        """Test jobs = 0 or true in the config is rejected like --jobs 0"""
+        self.mock_config.values = {**PARSE_OPTIONS_CONFIG, "jobs": jobs}
+
+        with pytest.raises(SystemExit):
+            parse_options()
 
 
 class TestCustomConfig:
@@ -417,21 +458,22 @@ class TestCustomConfig:
         with tempfile.TemporaryDirectory() as temp_dir:
             # Create a custom config file
             custom_config_path = Path(temp_dir) / "custom_config.toml"
-            with custom_config_path.open("w") as f:
-                f.write(
-                    """
-logLevel = 10
-mkvmergePath = "/custom/path/to/mkvmerge"
-mkvpropeditPath = "/custom/path/to/mkvpropedit"
-atomicParsleyPath = "/custom/path/to/AtomicParsley"
-setDefaultSubtitle = true
-forceDefaultFirstSubtitle = true
-useSystemLocale = false
-language = "fr"
-onlyMkv = true
-onlyMp4 = false
-"""
-                )
+            custom_config_path.write_bytes(
+                tomli_w.dumps(
+                    {
+                        "logLevel": 10,
+                        "mkvmergePath": "/custom/path/to/mkvmerge",
+                        "mkvpropeditPath": "/custom/path/to/mkvpropedit",
+                        "atomicParsleyPath": "/custom/path/to/AtomicParsley",
+                        "setDefaultSubtitle": True,
+                        "forceDefaultFirstSubtitle": True,
+                        "useSystemLocale": False,
+                        "language": "fr",
+                        "onlyMkv": True,
+                        "onlyMp4": False,
+                    }
+                ).encode()
+            )
 
             # Initialize config with custom file
             config = initialize_config(custom_config_path)
@@ -471,14 +513,11 @@ onlyMp4 = false
         with tempfile.TemporaryDirectory() as temp_dir:
             # Create a custom config file with only some settings
             custom_config_path = Path(temp_dir) / "partial_config.toml"
-            with custom_config_path.open("w") as f:
-                f.write(
-                    """
-logLevel = 40
-language = "de"
-onlyMkv = true
-"""
-                )
+            custom_config_path.write_bytes(
+                tomli_w.dumps(
+                    {"logLevel": 40, "language": "de", "onlyMkv": True}
+                ).encode()
+            )
 
             # Initialize config with custom file
             config = initialize_config(custom_config_path)
@@ -497,16 +536,17 @@ onlyMkv = true
         with tempfile.TemporaryDirectory() as temp_dir:
             # Create a custom config file
             custom_config_path = Path(temp_dir) / "custom.toml"
-            with custom_config_path.open("w") as f:
-                f.write(
-                    """
-logLevel = 10
-language = "es"
-useSystemLocale = false
-setDefaultSubtitle = true
-onlyMkv = true
-"""
-                )
+            custom_config_path.write_bytes(
+                tomli_w.dumps(
+                    {
+                        "logLevel": 10,
+                        "language": "es",
+                        "useSystemLocale": False,
+                        "setDefaultSubtitle": True,
+                        "onlyMkv": True,
+                    }
+                ).encode()
+            )
 
             # Mock the args.config to use our test file
             with patch("mcoptions._create_argument_parser") as mock_parser_func:
@@ -526,6 +566,7 @@ onlyMkv = true
                 mock_args.set_default_subtitle = False
                 mock_args.force_default_first_subtitle = False
                 mock_args.logfile = None
+                mock_args.jobs = None
 
                 mock_parser.parse_args.return_value = mock_args
                 mock_parser_func.return_value = mock_parser
@@ -557,15 +598,16 @@ onlyMkv = true
         with tempfile.TemporaryDirectory() as temp_dir:
             # Create a custom config file
             custom_config_path = Path(temp_dir) / "custom.toml"
-            with custom_config_path.open("w") as f:
-                f.write(
-                    """
-logLevel = 10
-language = "es"
-setDefaultSubtitle = true
-onlyMkv = true
-"""
-                )
+            custom_config_path.write_bytes(
+                tomli_w.dumps(
+                    {
+                        "logLevel": 10,
+                        "language": "es",
+                        "setDefaultSubtitle": True,
+                        "onlyMkv": True,
+                    }
+                ).encode()
+            )
 
             # Mock the args to use our test file and CLI overrides
             with patch("mcoptions._create_argument_parser") as mock_parser_func:
@@ -588,6 +630,7 @@ onlyMkv = true
                 mock_args.logfile = None
                 mock_args.stdout = False  # CLI default (not specified)
                 mock_args.stdout_only = False  # CLI default (not specified)
+                mock_args.jobs = None  # CLI default (not specified)
 
                 mock_parser.parse_args.return_value = mock_args
                 mock_parser_func.return_value = mock_parser
@@ -609,15 +652,16 @@ onlyMkv = true
         with tempfile.TemporaryDirectory() as temp_dir:
             # Create a custom config file with different values from defaults
             custom_config_path = Path(temp_dir) / "custom.toml"
-            with custom_config_path.open("w") as f:
-                f.write(
-                    """
-logLevel = 10
-setDefaultSubtitle = true
-language = "de"
-useSystemLocale = false
-"""
-                )
+            custom_config_path.write_bytes(
+                tomli_w.dumps(
+                    {
+                        "logLevel": 10,
+                        "setDefaultSubtitle": True,
+                        "language": "de",
+                        "useSystemLocale": False,
+                    }
+                ).encode()
+            )
 
             # Mock minimal CLI args (no overrides)
             with patch("mcoptions._create_argument_parser") as mock_parser_func:
@@ -640,6 +684,7 @@ useSystemLocale = false
                 mock_args.logfile = None
                 mock_args.stdout = False  # No CLI override
                 mock_args.stdout_only = False  # No CLI override
+                mock_args.jobs = None  # No CLI override
 
                 mock_parser.parse_args.return_value = mock_args
                 mock_parser_func.return_value = mock_parser
@@ -665,34 +710,21 @@ class TestOptions:
 
     def test_options_creation(self):
         """Test Options dataclass creation"""
-        from langcodes import Language
-
-        options = Options(
-            paths=["test.mkv"],
-            input_file=None,
-            dry_run=False,
-            only_mkv=False,
-            only_mp4=False,
-            language="en",
-            lang_object=Language.get("en"),
-            lang3="eng",
-            use_system_locale=True,
-            detected_locale="en",
-            mkvmerge_path="",
-            mkvpropedit_path="",
-            atomicparsley_path="",
-            log_level=20,
-            log_file_path="/tmp/test.log",
-            stdout=False,
-            stdout_only=False,
-            set_default_sub_track=False,
-            force_default_first_subtitle=False,
-            set_default_audio_track=False,
-            clear_audio_track_names=False,
-            sources={},
+        options = make_options(
+            paths=["test.mkv"], detected_locale="en", log_file_path="/tmp/test.log"
         )
 
+        assert isinstance(options, Options)
         assert options.paths == ["test.mkv"]
         assert options.language == "en"
         assert options.lang3 == "eng"
         assert options.dry_run is False
+        # Each call builds its own mutable fields
+        assert make_options().paths == []
+        assert make_options().paths is not make_options().paths
+
+    def test_options_is_frozen(self):
+        """Test that Options fields cannot be reassigned after creation"""
+        options = make_options()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            options.dry_run = True  # type: ignore[misc]
@@ -4,7 +4,8 @@ Edge case tests using the created test files
 
 import subprocess
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
 
 import pytest
 
@@ -18,10 +19,16 @@ from main import (
 )
 from .test_helpers import setup_complete_mock_options
 
+# Large metadata payloads, built once rather than on every run of the test
+_LARGE_STDOUT = "x" * 10000000  # 10MB of data
+_LARGE_METADATA = {
+    "tracks": [{"type": "video", "properties": {"data": "x" * 1000000}}] * 100
+}
 
-@pytest.fixture(autouse=True)
+
+@pytest.fixture(scope="module", autouse=True)
 def setup_tools():
-    """Automatically initialize tools for all tests in this module"""
+    """Initialize tools once for all tests in this module"""
     # Check if tools are available, skip tests if not
     import shutil
     
@@ -39,45 +46,30 @@ def setup_tools():
 class TestEdgeCasesWithRealFiles:
     """Test edge cases using actual test files"""
 
-    def test_video_only_mkv(self, test_files_dir):
-        """Test processing video-only MKV file"""
-        video_only_file = test_files_dir / "video_only.mkv"
-
-        if not video_only_file.exists():
-            pytest.skip("video_only.mkv test file not found")
-
-        # Test metadata extraction
-        metadata = get_mkv_metadata(str(video_only_file))
-
-        # Should have video track but no audio track
-        assert metadata is not None
-        assert has_audio_tracks(metadata) is False
-
-        # Should have at least one video track
-        video_tracks = [
-            t for t in metadata.get("tracks", []) if t.get("type") == "video"
-        ]
-        assert len(video_tracks) > 0
-
-    def test_audio_only_mkv(self, test_files_dir):
-        """Test processing audio-only MKV file"""
-        audio_only_file = test_files_dir / "audio_only.mkv"
+    @pytest.mark.parametrize(
+        ("filename", "expect_audio", "expect_video"),
+        [("video_only.mkv", False, True), ("audio_only.mkv", True, False)],
+        ids=["video_only", "audio_only"],
+    )
+    def test_single_track_type_mkv(
+        self, filename, expect_audio, expect_video, test_files_dir
+    ):
+        """Test processing MKV files with only video or only audio tracks"""
+        mkv_file = test_files_dir / filename
 
-        if not audio_only_file.exists():
-            pytest.skip("audio_only.mkv test file not found")
+        if not mkv_file.exists():
+            pytest.skip(f"{filename} test file not found")
 
         # Test metadata extraction
-        metadata = get_mkv_metadata(str(audio_only_file))
+        metadata = get_mkv_metadata(str(mkv_file))
 
-        # Should have audio track but no video track
         assert metadata is not None
-        assert has_audio_tracks(metadata) is True
+        assert has_audio_tracks(metadata) is expect_audio
 
-        # Should have no video tracks
         video_tracks = [
             t for t in metadata.get("tracks", []) if t.get("type") == "video"
         ]
-        assert len(video_tracks) == 0
+        assert (len(video_tracks) > 0) is expect_video
 
     def test_multi_subtitle_mkv(self, test_files_dir):
         """Test processing MKV file with multiple subtitle tracks"""
@@ -153,29 +145,20 @@ class TestEdgeCasesWithRealFiles:
         assert metadata is not None
         assert "tracks" in metadata
 
-    def test_empty_mkv_file(self, test_files_dir):
-        """Test processing empty MKV file"""
-        empty_file = test_files_dir / "empty.mkv"
-
-        if not empty_file.exists():
-            pytest.skip("empty.mkv test file not found")
-
-        # Test metadata extraction - should fail gracefully
-        metadata = get_mkv_metadata(str(empty_file))
-
-        # Should return valid JSON but with recognized=false
-        assert metadata is not None
-        assert metadata.get("container", {}).get("recognized") is False
-
-    def test_fake_video_file(self, test_files_dir):
-        """Test processing fake video file (text file with video extension)"""
-        fake_file = test_files_dir / "fake_video.mkv"
+    @pytest.mark.parametrize(
+        "filename",
+        # An empty file and a text file with a video extension
+        ["empty.mkv", "fake_video.mkv"],
+    )
+    def test_unrecognized_mkv_file(self, filename, test_files_dir):
+        """Test processing MKV files that are not Matroska at all"""
+        mkv_file = test_files_dir / filename
 
-        if not fake_file.exists():
-            pytest.skip("fake_video.mkv test file not found")
+        if not mkv_file.exists():
+            pytest.skip(f"{filename} test file not found")
 
         # Test metadata extraction - should fail gracefully
-        metadata = get_mkv_metadata(str(fake_file))
+        metadata = get_mkv_metadata(str(mkv_file))
 
         # Should return valid JSON but with recognized=false
         assert metadata is not None
@@ -283,7 +266,7 @@ class TestErrorHandling:
     @patch("main.get_mkv_metadata")
     @patch("main.logger")
     def test_process_mkv_subprocess_error(
-        self, mock_logger, mock_get_metadata, mock_run, mock_options
+        self, mock_logger, mock_get_metadata, mock_run, mock_options, dummy_mkv
     ):
         """Test handling of subprocess error during MKV processing"""
         # Setup
@@ -294,28 +277,17 @@ class TestErrorHandling:
         ).__dict__)
 
         mock_get_metadata.return_value = {"tracks": [{"type": "video"}]}
-        mock_run.side_effect = subprocess.CalledProcessError(
-            1, "mkvpropedit", output="Error message"
+        mock_run.return_value = SimpleNamespace(
+            returncode=1, stdout="Error message", stderr=""
         )
 
-        # Create temp file
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(suffix=".mkv", delete=False) as temp_file:
-            temp_file.write(b"fake mkv content")
-            temp_path = temp_file.name
-
-        try:
-            # Test
-            process_mkv_file(temp_path)
-
-            # Should log error and increment error counter
-            mock_logger.error.assert_called()
-            error_call = mock_logger.error.call_args[0][0]
-            assert "Error processing file" in error_call
+        # Test
+        process_mkv_file(dummy_mkv)
 
-        finally:
-            Path(temp_path).unlink()
+        # Should log error and increment error counter
+        mock_logger.error.assert_called()
+        error_call = mock_logger.error.call_args[0][0]
+        assert "Error processing file" in error_call
 
     @patch("main.options")
     @patch("main.atomicparsley", "/usr/bin/AtomicParsley")
@@ -323,35 +295,24 @@ class TestErrorHandling:
     @patch("main.get_mp4_metadata")
     @patch("main.logger")
     def test_process_mp4_subprocess_error(
-        self, mock_logger, mock_get_metadata, mock_run, mock_options
+        self, mock_logger, mock_get_metadata, mock_run, mock_options, dummy_mp4
     ):
         """Test handling of subprocess error during MP4 processing"""
         # Setup
         mock_options.configure_mock(**setup_complete_mock_options(dry_run=False).__dict__)
 
         mock_get_metadata.return_value = {"title": "Test", "description": "Test"}
-        mock_run.side_effect = subprocess.CalledProcessError(
-            1, "AtomicParsley", output="Error message"
+        mock_run.return_value = SimpleNamespace(
+            returncode=1, stdout="Error message", stderr=""
         )
 
-        # Create temp file
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_file:
-            temp_file.write(b"fake mp4 content")
-            temp_path = temp_file.name
-
-        try:
-            # Test
-            process_mp4_file(temp_path)
-
-            # Should log error and increment error counter
-            mock_logger.error.assert_called()
-            error_call = mock_logger.error.call_args[0][0]
-            assert "Error processing file" in error_call
+        # Test
+        process_mp4_file(dummy_mp4)
 
-        finally:
-            Path(temp_path).unlink()
+        # Should log error and increment error counter
+        mock_logger.error.assert_called()
+        error_call = mock_logger.error.call_args[0][0]
+        assert "Error processing file" in error_call
 
 
 class TestFileSystemEdgeCases:
@@ -389,8 +350,7 @@ class TestFileSystemEdgeCases:
         test_file = str(Path(long_path) / "test_file_with_very_long_name.mkv")
 
         # Create fake file
-        with Path(test_file).open("w") as f:
-            f.write("fake content")
+        Path(test_file).write_text("fake content")
 
         # Should handle long paths gracefully
         result = get_mkv_metadata(test_file)
@@ -404,8 +364,7 @@ class TestFileSystemEdgeCases:
         unicode_file = str(Path(temp_dir) / "测试文件_éñtürñätīõñål.mkv")
 
         # Create fake file
-        with Path(unicode_file).open("w") as f:
-            f.write("fake content")
+        Path(unicode_file).write_text("fake content")
 
         # Should handle unicode paths gracefully
         result = get_mkv_metadata(unicode_file)
@@ -423,28 +382,27 @@ class TestMemoryAndPerformance:
     def test_large_json_metadata(self, mock_run, mock_json_loads):
         """Test handling of very large JSON metadata"""
         # Create mock result with large stdout
-        mock_result = MagicMock()
-        mock_result.stdout = "x" * 10000000  # 10MB of data
-        mock_run.return_value = mock_result
+        mock_run.return_value = SimpleNamespace(
+            stdout=_LARGE_STDOUT, returncode=0, stderr=""
+        )
 
         # Mock json.loads to return large structure
-        large_metadata = {
-            "tracks": [{"type": "video", "properties": {"data": "x" * 1000000}}] * 100
-        }
-        mock_json_loads.return_value = large_metadata
+        mock_json_loads.return_value = _LARGE_METADATA
 
         result = get_mkv_metadata("test.mkv")
 
         # Should handle large metadata gracefully
-        assert result == large_metadata
+        assert result == _LARGE_METADATA
 
     @patch("main.subprocess.run")
     def test_malformed_json_metadata(self, mock_run):
         """Test handling of malformed JSON metadata"""
         # Create mock result with malformed JSON
-        mock_result = MagicMock()
-        mock_result.stdout = '{"tracks": [{"type": "video", "incomplete": }'
-        mock_run.return_value = mock_result
+        mock_run.return_value = SimpleNamespace(
+            stdout='{"tracks": [{"type": "video", "incomplete": }',
+            returncode=0,
+            stderr="",
+        )
 
         # Should raise JSONDecodeError
         with pytest.raises(Exception):  # json.JSONDecodeError
@@ -454,9 +412,7 @@ class TestMemoryAndPerformance:
     def test_empty_json_metadata(self, mock_run):
         """Test handling of empty JSON metadata"""
         # Create mock result with empty JSON
-        mock_result = MagicMock()
-        mock_result.stdout = "{}"
-        mock_run.return_value = mock_result
+        mock_run.return_value = SimpleNamespace(stdout="{}", returncode=0, stderr="")
 
         result = get_mkv_metadata("test.mkv")
 
@@ -2,60 +2,77 @@
 Tests for file I/O error handling scenarios
 """
 
-import tempfile
-from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
 from main import read_paths_from_file
 
 
-class TestFileErrorHandling:
-    """Test file I/O error handling scenarios"""
+@pytest.fixture(scope="module")
+def empty_file(tmp_path_factory):
+    """Empty paths file, shared by the module"""
+    paths_file = tmp_path_factory.mktemp("paths") / "empty.txt"
+    paths_file.write_bytes(b"")
+    return paths_file
+
+
+@pytest.fixture(scope="module")
+def comments_file(tmp_path_factory):
+    """Paths file mixing comments, blank lines and paths, shared by the module"""
+    paths_file = tmp_path_factory.mktemp("paths") / "comments.txt"
+    paths_file.write_bytes(
+        b"# This is a comment\n"
+        b"\n"  # Empty line
+        b"test1.mkv\n"
+        b"# Another comment\n"
+        b"   \n"  # Whitespace only
+        b"test2.mp4\n"
+    )
+    return paths_file
 
-    def test_read_paths_from_file_permission_denied(self):
-        """Test reading paths from file with permission denied"""
-        # Create a file and then remove read permissions
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp_file:
-            tmp_file.write("test.mkv\n")
-            tmp_file_path = tmp_file.name
 
-        try:
-            # Remove read permissions
-            Path(tmp_file_path).chmod(0o000)
+@pytest.fixture(scope="module")
+def dos_file(tmp_path_factory):
+    """Paths file with DOS line endings (\\r\\n), shared by the module"""
+    paths_file = tmp_path_factory.mktemp("paths") / "dos.txt"
+    paths_file.write_bytes(b"test1.mkv\r\ntest2.mp4\r\n")
+    return paths_file
 
-            # Should exit with error code 1
-            with pytest.raises(SystemExit) as exc_info:
-                read_paths_from_file(tmp_file_path)
 
-            assert exc_info.value.code == 1
+@pytest.fixture(scope="module")
+def missing_paths_file(tmp_path_factory):
+    """Paths file listing absolute paths that do not exist, shared by the module"""
+    paths_file = tmp_path_factory.mktemp("paths") / "missing.txt"
+    paths_file.write_bytes(b"/nonexistent/path1.mkv\n/another/nonexistent/path2.mp4\n")
+    return paths_file
+
+
+class TestFileErrorHandling:
+    """Test file I/O error handling scenarios"""
+
+    @patch("main.Path.open", side_effect=PermissionError("Permission denied"))
+    def test_read_paths_from_file_permission_denied(self, _mock_open):
+        """Test reading paths from file with permission denied"""
+        # Should exit with error code 1
+        with pytest.raises(SystemExit) as exc_info:
+            read_paths_from_file("paths.txt")
 
-        finally:
-            # Restore permissions and clean up
-            Path(tmp_file_path).chmod(0o644)
-            Path(tmp_file_path).unlink()
+        assert exc_info.value.code == 1
 
-    def test_read_paths_from_file_unicode_decode_error(self):
+    def test_read_paths_from_file_unicode_decode_error(self, tmp_path):
         """Test reading paths from file with invalid UTF-8 encoding"""
         # Create a file with invalid UTF-8 content
-        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as tmp_file:
-            # Write invalid UTF-8 bytes
-            tmp_file.write(b"\xff\xfe\x00\x00invalid utf-8")
-            tmp_file_path = tmp_file.name
+        paths_file = tmp_path / "paths.txt"
+        paths_file.write_bytes(b"\xff\xfe\x00\x00invalid utf-8")
 
-        try:
-            # Should exit with error code 1
-            with pytest.raises(SystemExit) as exc_info:
-                read_paths_from_file(tmp_file_path)
-
-            assert exc_info.value.code == 1
+        # Should exit with error code 1
+        with pytest.raises(SystemExit) as exc_info:
+            read_paths_from_file(str(paths_file))
 
-        finally:
-            # Clean up
-            Path(tmp_file_path).unlink()
+        assert exc_info.value.code == 1
 
-    @patch("main.open")
+    @patch("main.Path.open")
     def test_read_paths_from_file_general_exception(self, mock_file_open):
         """Test reading paths from file with general exception"""
         mock_file_open.side_effect = OSError("Unexpected I/O error")
@@ -66,116 +83,39 @@ class TestFileErrorHandling:
 
         assert exc_info.value.code == 1
 
-    def test_read_paths_from_file_empty_file(self):
-        """Test reading paths from empty file"""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp_file:
-            # Create empty file
-            tmp_file_path = tmp_file.name
-
-        try:
-            result = read_paths_from_file(tmp_file_path)
-
-            # Should return empty list
-            assert result == []
-
-        finally:
-            # Clean up
-            Path(tmp_file_path).unlink()
-
-    @patch("main.logger")
-    def test_read_paths_from_file_with_comments_and_empty_lines(self, mock_logger):
-        """Test reading paths file with comments and empty lines"""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp_file:
-            tmp_file.write("# This is a comment\n")
-            tmp_file.write("\n")  # Empty line
-            tmp_file.write("test1.mkv\n")
-            tmp_file.write("# Another comment\n")
-            tmp_file.write("   \n")  # Whitespace only
-            tmp_file.write("test2.mp4\n")
-            tmp_file_path = tmp_file.name
-
-        try:
-            result = read_paths_from_file(tmp_file_path)
-
-            # Should return empty list since paths don't exist
-            assert result == []
-
-            # Should log warnings for non-existent paths
-            mock_logger.warning.assert_called()
-
-        finally:
-            # Clean up
-            Path(tmp_file_path).unlink()
-
-    @patch("main.logger")
-    def test_read_paths_from_file_dos_line_endings(self, mock_logger):
-        """Test reading paths file with DOS line endings"""
-        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as tmp_file:
-            # Write content with DOS line endings (\r\n)
-            tmp_file.write(b"test1.mkv\r\n")
-            tmp_file.write(b"test2.mp4\r\n")
-            tmp_file_path = tmp_file.name
-
-        try:
-            result = read_paths_from_file(tmp_file_path)
-
-            # Should return empty list since paths don't exist
-            assert result == []
-
-            # Should log warnings for non-existent paths
-            mock_logger.warning.assert_called()
-
-        finally:
-            # Clean up
-            Path(tmp_file_path).unlink()
-
-    @patch("main.logger")
-    def test_read_paths_from_file_nonexistent_paths(self, mock_logger):
-        """Test reading paths file where listed paths don't exist"""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp_file:
-            tmp_file.write("/nonexistent/path1.mkv\n")
-            tmp_file.write("/another/nonexistent/path2.mp4\n")
-            tmp_file_path = tmp_file.name
-
-        try:
-            result = read_paths_from_file(tmp_file_path)
-
-            # Should return empty list since paths don't exist
-            assert result == []
-
-            # Should log warnings for non-existent paths
-            mock_logger.warning.assert_called()
-
-        finally:
-            # Clean up
-            Path(tmp_file_path).unlink()
-
+    @pytest.mark.parametrize(
+        ("paths_fixture", "expect_warning"),
+        [
+            ("empty_file", False),
+            ("comments_file", True),
+            ("dos_file", True),
+            ("missing_paths_file", True),
+        ],
+        ids=["empty", "comments_and_empty_lines", "dos_line_endings", "nonexistent"],
+    )
+    def test_read_paths_from_file_without_usable_paths(
+        self, paths_fixture, expect_warning, request, monkeypatch
+    ):
+        """Test paths files that yield no paths, warning about each missing one"""
+        paths_file = request.getfixturevalue(paths_fixture)
+        mock_logger = Mock()
+        monkeypatch.setattr("main.logger", mock_logger)
+
+        result = read_paths_from_file(str(paths_file))
+
+        # Should return empty list since no listed path exists
+        assert result == []
+        assert mock_logger.warning.called is expect_warning
+
+    @patch("main.Path.open", side_effect=PermissionError("Permission denied"))
     @patch("main.logger")
-    def test_read_paths_from_file_with_logging(self, mock_logger):
+    def test_read_paths_from_file_with_logging(self, mock_logger, _mock_open):
         """Test that file reading errors are properly logged"""
-        # Create a file and then remove read permissions
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp_file:
-            tmp_file.write("test.mkv\n")
-            tmp_file_path = tmp_file.name
-
-        try:
-            # Remove read permissions
-            Path(tmp_file_path).chmod(0o000)
-
-            # Should log permission error
-            with pytest.raises(SystemExit):
-                read_paths_from_file(tmp_file_path)
-
-            # Verify error was logged
-            mock_logger.error.assert_called()
-            error_calls = [
-                call
-                for call in mock_logger.error.call_args_list
-                if "Permission denied" in str(call)
-            ]
-            assert len(error_calls) > 0
-
-        finally:
-            # Restore permissions and clean up
-            Path(tmp_file_path).chmod(0o644)
-            Path(tmp_file_path).unlink()
+        # Should log permission error
+        with pytest.raises(SystemExit):
+            read_paths_from_file("paths.txt")
+
+        # Verify error was logged
+        mock_logger.error.assert_called_once_with(
+            "Permission denied reading input file: paths.txt"
+        )
@@ -2,137 +2,131 @@
 Tests for folder processing error scenarios
 """
 
-import tempfile
-from pathlib import Path
-from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
 
 import main
 from main import process_folder
 
+from .test_helpers import assert_logged
+
 
 class TestFolderProcessing:
     """Test folder processing error handling"""
 
+    @pytest.fixture(autouse=True)
+    def _reset_counters(self, monkeypatch):
+        """Start every test from zeroed folder counters and restore them afterwards"""
+        monkeypatch.setattr(main, "folders_processed", 0)
+        monkeypatch.setattr(main, "folders_errored", 0)
+
     @patch("main.logger")
-    def test_process_folder_not_a_directory(self, mock_logger):
+    def test_process_folder_not_a_directory(self, mock_logger, tmp_path):
         """Test folder processing when path is not a directory (lines 250-252)"""
         # Create a regular file (not a directory)
-        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-            tmp_file.write(b"not a directory")
-            file_path = tmp_file.name
-
-        try:
-            # Mock global variables
-            main.folders_errored = 0
+        regular_file = tmp_path / "not_a_directory"
+        regular_file.write_bytes(b"not a directory")
+        file_path = str(regular_file)
 
-            # Call process_folder with a file path instead of directory
-            process_folder(file_path)
+        # Call process_folder with a file path instead of directory
+        process_folder(file_path)
 
-            # Should log error and increment counter (lines 250-252)
-            mock_logger.error.assert_any_call(f"Path is not a directory: {file_path}")
-            assert main.folders_errored == 1
-
-        finally:
-            # Clean up
-            Path(file_path).unlink()
-            main.folders_errored = 0
+        # Should log error and increment counter (lines 250-252)
+        assert_logged(mock_logger, "error", "Path is not a directory")
+        assert main.folders_errored == 1
 
     @patch("main.logger")
     def test_process_folder_does_not_exist(self, mock_logger):
         """Test folder processing when folder does not exist"""
         nonexistent_path = "/tmp/definitely_does_not_exist_folder_12345"
 
-        # Mock global variables
-        main.folders_errored = 0
-
         # Call process_folder with non-existent path
         process_folder(nonexistent_path)
 
         # Should log error and increment counter
-        mock_logger.error.assert_any_call(f"Folder does not exist: {nonexistent_path}")
+        assert_logged(mock_logger, "error", "Folder does not exist")
         assert main.folders_errored == 1
 
-        # Reset
-        main.folders_errored = 0
-
     @patch("main.logger")
     @patch("os.walk")
-    def test_process_folder_general_exception(self, mock_walk, mock_logger):
+    def test_process_folder_general_exception(self, mock_walk, mock_logger, tmp_path):
         """Test folder processing with general exception (lines 268-270)"""
-        # Create a real directory for testing
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            # Mock os.walk to raise an exception
-            mock_walk.side_effect = PermissionError(
-                "Permission denied accessing directory"
-            )
+        tmp_dir = str(tmp_path)
 
-            # Mock global variables
-            main.folders_errored = 0
+        # Mock os.walk to raise an exception
+        mock_walk.side_effect = PermissionError("Permission denied accessing directory")
 
-            # Call process_folder - should catch exception
-            process_folder(tmp_dir)
+        # Call process_folder - should catch exception
+        process_folder(tmp_dir)
 
-            # Should log error and increment counter (lines 268-270)
-            mock_logger.error.assert_any_call(
-                f"Error processing folder {tmp_dir}: Permission denied accessing directory"
-            )
-            assert main.folders_errored == 1
-
-            # Reset
-            main.folders_errored = 0
+        # Should log error and increment counter (lines 268-270)
+        assert_logged(mock_logger, "error", "Permission denied accessing directory")
+        assert main.folders_errored == 1
 
     @patch("main.logger")
     @patch("main.process_mkv_file")
-    def test_process_folder_success_path(self, mock_process_mkv_file, mock_logger):
+    def test_process_folder_success_path(
+        self, mock_process_mkv_file, mock_logger, tmp_path
+    ):
         """Test successful folder processing to hit line 266"""
         # Create a directory with a test file
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            test_file = str(Path(tmp_dir) / "test.mkv")
-            with Path(test_file).open("w") as f:
-                f.write("fake content")
-
-            # Mock process_mkv_file to avoid actual processing
-            mock_process_mkv_file.return_value = None
-
-            # Mock global variables
-            main.folders_processed = 0
+        (tmp_path / "test.mkv").write_bytes(b"fake content")
 
-            # Mock options to avoid only_mp4 filter
-            with patch("main.options") as mock_options:
-                mock_options.only_mp4 = False
+        # Mock process_mkv_file to avoid actual processing
+        mock_process_mkv_file.return_value = None
 
-                # Call process_folder
-                process_folder(tmp_dir)
+        # Mock options to avoid only_mp4 filter
+        with patch("main.options") as mock_options:
+            mock_options.only_mp4 = False
 
-            # Should increment folders_processed counter (line 266)
-            assert main.folders_processed == 1
+            # Call process_folder
+            process_folder(str(tmp_path))
 
-            # Should have called process_mkv_file for the test file
-            mock_process_mkv_file.assert_called()
+        # Should increment folders_processed counter (line 266)
+        assert main.folders_processed == 1
 
-            # Reset
-            main.folders_processed = 0
+        # Should have called process_mkv_file for the test file
+        mock_process_mkv_file.assert_called()
 
     @patch("main.logger")
     @patch("os.walk")
-    def test_process_folder_os_error_exception(self, mock_walk, mock_logger):
+    def test_process_folder_os_error_exception(self, mock_walk, mock_logger, tmp_path):
         """Test folder processing with OSError exception"""
-        # Create a real directory for testing
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            # Mock os.walk to raise an OSError
-            mock_walk.side_effect = OSError("I/O error accessing directory")
+        tmp_dir = str(tmp_path)
 
-            # Mock global variables
-            main.folders_errored = 0
+        # Mock os.walk to raise an OSError
+        mock_walk.side_effect = OSError("I/O error accessing directory")
 
-            # Call process_folder - should catch exception
-            process_folder(tmp_dir)
+        # Call process_folder - should catch exception
+        process_folder(tmp_dir)
 
-            # Should log error and increment counter (lines 268-270)
-            mock_logger.error.assert_any_call(
-                f"Error processing folder {tmp_dir}: I/O error accessing directory"
-            )
-            assert main.folders_errored == 1
+        # Should log error and increment counter (lines 268-270)
+        assert_logged(mock_logger, "error", "I/O error accessing directory")
+        assert main.folders_errored == 1
 
-            # Reset
-            main.folders_errored = 0
+    @patch("main.logger")
+    @patch("main.process_mkv_file", side_effect=RuntimeError("mkvmerge failed"))
+    def test_process_folder_queued_file_error(
+        self, _mock_process_mkv_file, mock_logger, monkeypatch, tmp_path
+    ):
+        """Test a file failing on the worker pool errors its folder once"""
+        for name in ("a.mkv", "b.mkv"):
+            (tmp_path / name).write_bytes(b"fake content")
+        monkeypatch.setattr(main, "options", Mock(only_mp4=False))
+        monkeypatch.setattr(main, "_pending", [])
+        monkeypatch.setattr(main, "_folder_results", {})
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            monkeypatch.setattr(main, "_executor", executor)
+            process_folder(str(tmp_path))
+            for future in main._pending:
+                future.result()
+
+        # Counted as in sequential mode: one errored folder, none processed
+        assert main.folders_errored == 1
+        assert main.folders_processed == 0
+        mock_logger.error.assert_called_once_with(
+            f"Error processing folder {tmp_path}: mkvmerge failed"
+        )
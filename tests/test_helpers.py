@@ -2,8 +2,11 @@
 Helper functions for tests to mock tool availability
 """
 
+from types import SimpleNamespace
 from unittest.mock import MagicMock, Mock
 
+from mcoptions import Options
+
 
 def setup_mock_tools():
     """
@@ -63,70 +66,73 @@ def setup_complete_mock_options(**overrides):
     defaults.update(overrides)
     
     mock_options = Mock()
-    for key, value in defaults.items():
-        setattr(mock_options, key, value)
-    
+    mock_options.configure_mock(**defaults)
+
     return mock_options
 
 
-def create_mock_options(**overrides):
-    """Create a complete mock options object with all required attributes"""
-    mock_lang_object = MagicMock()
-    mock_lang_object.display_name.return_value = "English"
-
-    # Default options
-    default_options = {
-        "paths": [],
-        "input_file": None,
-        "dry_run": False,
-        "only_mkv": False,
-        "only_mp4": False,
-        "log_file_path": None,
-        "log_level": 20,
-        "stdout": False,
-        "stdout_only": False,
-        "set_default_sub_track": False,
-        "force_default_first_subtitle": False,
-        "set_default_audio_track": False,
-        "clear_audio_track_names": False,
-        "use_system_locale": False,
-        "language": "en",
-        "lang3": "eng",
-        "lang_object": mock_lang_object,
-        "mkvpropedit_path": None,
-        "mkvmerge_path": None,
-        "atomicparsley_path": None,
-    }
+# Language stand-in for options.lang_object - main() only calls display_name()
+_LANG_OBJECT = SimpleNamespace(display_name=lambda: "English")
+
+# Immutable default options for create_mock_options(); paths is added per call
+_MOCK_OPTION_DEFAULTS = {
+    "input_file": None,
+    "dry_run": False,
+    "only_mkv": False,
+    "only_mp4": False,
+    "log_file_path": None,
+    "log_level": 20,
+    "stdout": False,
+    "stdout_only": False,
+    "set_default_sub_track": False,
+    "force_default_first_subtitle": False,
+    "set_default_audio_track": False,
+    "clear_audio_track_names": False,
+    "jobs": 1,
+    "use_system_locale": False,
+    "language": "en",
+    "lang3": "eng",
+    "lang_object": _LANG_OBJECT,
+    "mkvpropedit_path": None,
+    "mkvmerge_path": None,
+    "atomicparsley_path": None,
+}
+
+# Default sources for all options
+_MOCK_SOURCE_DEFAULTS = {
+    "language": "default",
+    "mkvmerge_path": "default",
+    "mkvpropedit_path": "default",
+    "atomicparsley_path": "default",
+    "only_mkv": "default",
+    "only_mp4": "default",
+    "set_default_sub_track": "default",
+    "force_default_first_subtitle": "default",
+    "set_default_audio_track": "default",
+    "clear_audio_track_names": "default",
+    "use_system_locale": "default",
+    "dry_run": "default",
+    "log_level": "default",
+    "stdout": "default",
+    "stdout_only": "default",
+    "jobs": "default",
+}
 
-    # Default sources for all options
-    default_sources = {
-        "language": "default",
-        "mkvmerge_path": "default",
-        "mkvpropedit_path": "default",
-        "atomicparsley_path": "default",
-        "only_mkv": "default",
-        "only_mp4": "default",
-        "set_default_sub_track": "default",
-        "force_default_first_subtitle": "default",
-        "set_default_audio_track": "default",
-        "clear_audio_track_names": "default",
-        "use_system_locale": "default",
-        "dry_run": "default",
-        "log_level": "default",
-        "stdout": "default",
-        "stdout_only": "default",
-    }
 
-    # Apply overrides
-    default_options.update(overrides)
-    if "sources" in overrides:
-        default_sources.update(overrides["sources"])
+def create_mock_options(**overrides):
+    """Create a complete mock options object with all required attributes"""
+    # Build mutable values per call so no mock shares them with another
+    options = {"paths": [], **_MOCK_OPTION_DEFAULTS, **overrides}
+    options["sources"] = {**_MOCK_SOURCE_DEFAULTS, **overrides.get("sources", {})}
 
     # Create mock object
-    mock_options = MagicMock()
-    for key, value in default_options.items():
-        setattr(mock_options, key, value)
-
-    mock_options.sources = default_sources
+    mock_options = MagicMock(spec=Options)
+    mock_options.configure_mock(**options)
 
     return mock_options
+
+
+def assert_logged(mock_logger, level, fragment):
+    """Assert that mock_logger logged a message containing fragment at level"""
+    messages = [c.args[0] for c in getattr(mock_logger, level).call_args_list if c.args]
+    assert any(fragment in str(message) for message in messages), messages
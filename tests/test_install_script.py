@@ -2,79 +2,96 @@
 Integration tests for the install script functionality
 """
 
-import subprocess
+import re
+import runpy
 import sys
-from pathlib import Path
+from collections import Counter
+
+import pytest
+
+# Checksum comparison code the install script must contain
+_CHECKSUM_MARKERS = (
+    "def calculate_file_checksum",
+    "hashlib.sha256()",
+    "source_checksum = calculate_file_checksum",
+    "target_checksum = calculate_file_checksum",
+    "Checksums match. Skipping",
+    "Checksums differ. Overwriting",
+    "already up to date",
+    "different version",
+)
+_CHECKSUM_PATTERN = re.compile("|".join(map(re.escape, _CHECKSUM_MARKERS)))
+
+# Preserved-config warning the install script shows after uninstalling
+_CONFIG_WARNING_MARKERS = (
+    "def check_and_warn_about_preserved_config",
+    "Your personal configuration and settings were preserved",
+    "Configuration folder:",
+    "Configuration file:",
+    "The new installation will use your existing settings",
+)
+
+# Config removal prompt in the uninstall script
+_CONFIG_PROMPT_MARKERS = (
+    "def prompt_remove_app_folder",
+    "personal configuration and logs",
+    "customized settings, preferences, and log history will be lost",
+    "Choose 'N' (default) to keep your settings for future reinstallation",
+    "Remove application folder and all data? [y/N]",
+    "The following personal files will be removed:",
+    "Personal configuration:",
+)
+
+
+def _run_help(script, monkeypatch, capsys):
+    """Run script --help in this interpreter and return what it printed"""
+    monkeypatch.setattr(sys, "argv", [script.name, "--help"])
+    # The scripts prepend "src" to sys.path when they load
+    monkeypatch.setattr(sys, "path", sys.path[:])
+
+    with pytest.raises(SystemExit) as exc_info:
+        runpy.run_path(str(script), run_name="__main__")
+
+    assert exc_info.value.code == 0
+    return capsys.readouterr().out
 
 
 class TestInstallScript:
     """Test the install script via subprocess"""
 
-    def test_install_script_help(self):
+    def test_install_script_help(self, install_script, monkeypatch, capsys):
         """Test that install script shows help without errors"""
-        install_script = Path(__file__).parent.parent / "install"
+        output = _run_help(install_script, monkeypatch, capsys)
 
-        result = subprocess.run(
-            [sys.executable, str(install_script), "--help"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-
-        assert result.returncode == 0
-        assert "Install application and file manager integrations" in result.stdout
-        assert "--dry-run" in result.stdout
-        assert "--integrations" in result.stdout
-        assert "--skip-uninstall" in result.stdout
-        assert "--force" in result.stdout or "-f" in result.stdout
+        assert "Install application and file manager integrations" in output
+        assert "--dry-run" in output
+        assert "--integrations" in output
+        assert "--skip-uninstall" in output
+        assert "--force" in output or "-f" in output
 
-    def test_install_script_dry_run(self):
+    @pytest.mark.slow
+    def test_install_script_dry_run(self, run_install):
         """Test install script dry run mode"""
-        install_script = Path(__file__).parent.parent / "install"
-
-        result = subprocess.run(
-            [sys.executable, str(install_script), "--dry-run", "--integrations"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
+        result = run_install("--dry-run", "--integrations")
 
         assert result.returncode == 0
         assert "DRY RUN MODE" in result.stdout
         assert "Dry run completed" in result.stdout
 
-    def test_install_script_skip_uninstall(self):
+    @pytest.mark.slow
+    def test_install_script_skip_uninstall(self, run_install):
         """Test install script with skip-uninstall flag"""
-        install_script = Path(__file__).parent.parent / "install"
-
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(install_script),
-                "--dry-run",
-                "--integrations",
-                "--skip-uninstall",
-            ],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
+        result = run_install("--dry-run", "--integrations", "--skip-uninstall")
 
         assert result.returncode == 0
         assert "DRY RUN MODE" in result.stdout
         # Should not see existing installation detection when skipped
         assert "Existing installation detected" not in result.stdout
 
-    def test_install_script_detects_existing(self):
+    @pytest.mark.slow
+    def test_install_script_detects_existing(self, run_install):
         """Test that install script detects existing installations using uninstall script"""
-        install_script = Path(__file__).parent.parent / "install"
-
-        result = subprocess.run(
-            [sys.executable, str(install_script), "--dry-run", "--integrations"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
+        result = run_install("--dry-run", "--integrations")
 
         assert result.returncode == 0
         # Should detect existing installation if one exists, or proceed if none
@@ -91,47 +108,28 @@ class TestInstallScript:
                 or "Quick Action:" in result.stdout
             )
 
-    def test_install_script_force_flag(self):
+    @pytest.mark.slow
+    def test_install_script_force_flag(self, run_install):
         """Test install script with --force flag"""
-        install_script = Path(__file__).parent.parent / "install"
-
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(install_script),
-                "--dry-run",
-                "--integrations",
-                "--force",
-            ],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
+        result = run_install("--dry-run", "--integrations", "--force")
 
         assert result.returncode == 0
         assert "DRY RUN MODE" in result.stdout
         # Force flag should work in dry run mode
 
-    def test_install_script_contains_config_warning_function(self):
+    def test_install_script_contains_config_warning_function(self, install_script_text):
         """Test that the install script contains the config preservation warning function"""
-        install_script = Path(__file__).parent.parent / "install"
-
-        # Read the install script content
-        content = install_script.read_text()
+        content = install_script_text
 
         # Verify the function exists in the script
-        assert "def check_and_warn_about_preserved_config" in content
-        assert "Your personal configuration and settings were preserved" in content
-        assert "Configuration folder:" in content
-        assert "Configuration file:" in content
-        assert "The new installation will use your existing settings" in content
+        missing = [m for m in _CONFIG_WARNING_MARKERS if m not in content]
+        assert not missing, f"Config warning markers not found: {missing}"
 
-    def test_install_script_calls_config_warning_after_uninstall(self):
+    def test_install_script_calls_config_warning_after_uninstall(
+        self, install_script_text
+    ):
         """Test that install script calls config warning function after successful uninstall"""
-        install_script = Path(__file__).parent.parent / "install"
-
-        # Read the install script content
-        content = install_script.read_text()
+        content = install_script_text
 
         # Verify the function is called after successful uninstall
         assert "check_and_warn_about_preserved_config()" in content
@@ -155,75 +153,42 @@ class TestInstallScript:
         warning_section = content[warning_index : warning_index + 500]
         assert "check_and_warn_about_preserved_config" in warning_section
 
-    def test_install_script_contains_checksum_functionality(self):
+    def test_install_script_contains_checksum_functionality(self, install_script_text):
         """Test that install script contains checksum comparison functionality"""
-        install_script = Path(__file__).parent.parent / "install"
-
-        # Read the install script content
-        content = install_script.read_text()
+        content = install_script_text
 
-        # Verify checksum function exists
-        assert "def calculate_file_checksum" in content
-        assert "hashlib.sha256()" in content
+        # Count every checksum marker in a single pass over the script
+        found = Counter(m.group() for m in _CHECKSUM_PATTERN.finditer(content))
 
-        # Verify checksum comparison logic exists in both platforms
-        assert "source_checksum = calculate_file_checksum" in content
-        assert "target_checksum = calculate_file_checksum" in content
-        assert "Checksums match. Skipping" in content
-        assert "Checksums differ. Overwriting" in content
-        assert "already up to date" in content
-        assert "different version" in content
+        # Verify the checksum function and comparison logic exist
+        missing = [marker for marker in _CHECKSUM_MARKERS if marker not in found]
+        assert not missing, f"Checksum markers not found: {missing}"
 
         # Should have the function in both Linux and macOS binary install functions
-        assert content.count("source_checksum = calculate_file_checksum") >= 2
+        assert found["source_checksum = calculate_file_checksum"] >= 2
 
-    def test_uninstall_script_contains_config_prompts(self):
+    def test_uninstall_script_contains_config_prompts(self, uninstall_script_text):
         """Test that uninstall script contains proper config removal prompts"""
-        uninstall_script = Path(__file__).parent.parent / "uninstall"
-
-        # Read the uninstall script content
-        content = uninstall_script.read_text()
+        content = uninstall_script_text
 
         # Verify config removal prompting exists
-        assert "def prompt_remove_app_folder" in content
-        assert "personal configuration and logs" in content
-        assert (
-            "customized settings, preferences, and log history will be lost" in content
-        )
-        assert (
-            "Choose 'N' (default) to keep your settings for future reinstallation"
-            in content
-        )
-        assert "Remove application folder and all data? [y/N]" in content
-        assert "The following personal files will be removed:" in content
-        assert "Personal configuration:" in content
+        missing = [m for m in _CONFIG_PROMPT_MARKERS if m not in content]
+        assert not missing, f"Config prompt markers not found: {missing}"
 
-    def test_uninstall_script_preserve_config_option(self):
+    def test_uninstall_script_preserve_config_option(
+        self, uninstall_script, monkeypatch, capsys
+    ):
         """Test that uninstall script has --preserve-config option"""
-        uninstall_script = Path(__file__).parent.parent / "uninstall"
-
         # Test that help includes the option
-        result = subprocess.run(
-            [sys.executable, str(uninstall_script), "--help"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
+        output = _run_help(uninstall_script, monkeypatch, capsys)
 
-        assert result.returncode == 0
-        assert "--preserve-config" in result.stdout
-        assert "Preserve user configuration and logs" in result.stdout
+        assert "--preserve-config" in output
+        assert "Preserve user configuration and logs" in output
 
-    def test_uninstall_script_preserve_config_dry_run(self):
+    @pytest.mark.slow
+    def test_uninstall_script_preserve_config_dry_run(self, run_uninstall):
         """Test uninstall script with --preserve-config in dry-run mode"""
-        uninstall_script = Path(__file__).parent.parent / "uninstall"
-
-        result = subprocess.run(
-            [sys.executable, str(uninstall_script), "--dry-run", "--preserve-config"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
+        result = run_uninstall("--dry-run", "--preserve-config")
 
         assert result.returncode == 0
         assert "DRY RUN MODE" in result.stdout
@@ -232,28 +197,17 @@ class TestInstallScript:
         # Should not show config removal prompts
         assert "The following personal files will be removed:" not in result.stdout
 
-    def test_uninstall_script_preserve_config_conflicts(self):
+    @pytest.mark.slow
+    def test_uninstall_script_preserve_config_conflicts(self, run_uninstall):
         """Test that --preserve-config works with other flags"""
-        uninstall_script = Path(__file__).parent.parent / "uninstall"
-
         # Test --preserve-config alone
-        result = subprocess.run(
-            [sys.executable, str(uninstall_script), "--dry-run", "--preserve-config"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
+        result = run_uninstall("--dry-run", "--preserve-config")
 
         assert result.returncode == 0
         assert "Would preserve user configuration" in result.stdout
 
         # Test that --integrations still skips config (should not conflict)
-        result = subprocess.run(
-            [sys.executable, str(uninstall_script), "--dry-run", "--integrations"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
+        result = run_uninstall("--dry-run", "--integrations")
 
         assert result.returncode == 0
         # With --integrations, should not mention config preservation at all
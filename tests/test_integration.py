@@ -2,178 +2,130 @@
 Integration tests for file processing workflows
 """
 
-import tempfile
-from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+import main
 from main import process_folder, process_mkv_file, process_mp4_file
 
+from .test_helpers import assert_logged
+
+# Read-only MKV metadata shared across tests
+_META_VIDEO_AUDIO_SUB = MappingProxyType(
+    {"tracks": ({"type": "video"}, {"type": "audio"}, {"type": "subtitles"})}
+)
+_META_VIDEO_SUB = MappingProxyType(
+    {"tracks": ({"type": "video"}, {"type": "subtitles"})}
+)
+_META_VIDEO = MappingProxyType({"tracks": ({"type": "video"},)})
+
 
 class TestProcessMkvFile:
     """Integration tests for MKV file processing"""
 
-    @patch("main.options")
-    @patch("main.mkvpropedit", "/usr/bin/mkvpropedit")
-    @patch("main.mkvmerge", "/usr/bin/mkvmerge")
-    @patch("main.subprocess.run")
-    @patch("main.get_mkv_metadata")
-    @patch("main.logger")
-    def test_process_mkv_file_with_audio(
-        self, mock_logger, mock_get_metadata, mock_run, mock_options
-    ):
+    @pytest.fixture(autouse=True)
+    def mkv_mocks(self, monkeypatch):
+        """Provide both MKV tools and replace the logger, metadata and tool runs"""
+        mocks = SimpleNamespace(
+            logger=MagicMock(),
+            get_metadata=MagicMock(),
+            run=MagicMock(return_value=MagicMock(returncode=0)),
+        )
+        monkeypatch.setattr("main.mkvpropedit", "/usr/bin/mkvpropedit")
+        monkeypatch.setattr("main.mkvmerge", "/usr/bin/mkvmerge")
+        monkeypatch.setattr("main.logger", mocks.logger)
+        monkeypatch.setattr("main.get_mkv_metadata", mocks.get_metadata)
+        monkeypatch.setattr("main.subprocess.run", mocks.run)
+        return mocks
+
+    def test_process_mkv_file_with_audio(self, mkv_mocks, monkeypatch, dummy_mkv):
         """Test processing MKV file with audio tracks"""
         # Setup
-        mock_options.dry_run = False
-        mock_options.set_default_sub_track = False
-        mock_options.force_default_first_subtitle = False
-
-        mock_metadata = {
-            "tracks": [{"type": "video"}, {"type": "audio"}, {"type": "subtitles"}]
-        }
-        mock_get_metadata.return_value = mock_metadata
-
-        # Mock successful subprocess calls
-        mock_run.return_value = MagicMock()
-
-        # Create temp file
-        with tempfile.NamedTemporaryFile(suffix=".mkv", delete=False) as temp_file:
-            temp_file.write(b"fake mkv content")
-            temp_path = temp_file.name
-
-        try:
-            # Test
-            process_mkv_file(temp_path)
-
-            # Verify subprocess was called with audio track options
-            mock_run.assert_called_once()
-            call_args = mock_run.call_args[0][0]  # Get the command list
-
-            # Should include audio track options
-            assert "-e" in call_args
-            assert "track:a1" in call_args
-            assert "-d" in call_args
-            assert "name" in call_args
-
-            # Verify logging
-            mock_logger.info.assert_called()
-
-        finally:
-            Path(temp_path).unlink()
-
-    @patch("main.options")
-    @patch("main.mkvpropedit", "/usr/bin/mkvpropedit")
-    @patch("main.mkvmerge", "/usr/bin/mkvmerge")
-    @patch("main.subprocess.run")
-    @patch("main.get_mkv_metadata")
-    @patch("main.logger")
-    def test_process_mkv_file_without_audio(
-        self, mock_logger, mock_get_metadata, mock_run, mock_options
-    ):
+        monkeypatch.setattr(
+            "main.options",
+            MagicMock(
+                dry_run=False,
+                set_default_sub_track=False,
+                force_default_first_subtitle=False,
+            ),
+        )
+        mkv_mocks.get_metadata.return_value = _META_VIDEO_AUDIO_SUB
+
+        process_mkv_file(dummy_mkv)
+
+        # Verify subprocess was called with audio track options
+        mkv_mocks.run.assert_called_once()
+        call_args = mkv_mocks.run.call_args[0][0]  # Get the command list
+
+        # Should include audio track options
+        assert "-e" in call_args
+        assert "track:a1" in call_args
+        assert "-d" in call_args
+        assert "name" in call_args
+
+        # Verify logging
+        mkv_mocks.logger.info.assert_called()
+
+    def test_process_mkv_file_without_audio(self, mkv_mocks, monkeypatch, dummy_mkv):
         """Test processing MKV file without audio tracks"""
         # Setup
-        mock_options.dry_run = False
-        mock_options.set_default_sub_track = False
-        mock_options.force_default_first_subtitle = False
+        monkeypatch.setattr(
+            "main.options",
+            MagicMock(
+                dry_run=False,
+                set_default_sub_track=False,
+                force_default_first_subtitle=False,
+            ),
+        )
+        mkv_mocks.get_metadata.return_value = _META_VIDEO_SUB
 
-        mock_metadata = {"tracks": [{"type": "video"}, {"type": "subtitles"}]}
-        mock_get_metadata.return_value = mock_metadata
-
-        # Mock successful subprocess calls
-        mock_run.return_value = MagicMock()
+        process_mkv_file(dummy_mkv)
 
-        # Create temp file
-        with tempfile.NamedTemporaryFile(suffix=".mkv", delete=False) as temp_file:
-            temp_file.write(b"fake mkv content")
-            temp_path = temp_file.name
+        # Verify subprocess was called without audio track options
+        mkv_mocks.run.assert_called_once()
+        call_args = mkv_mocks.run.call_args[0][0]  # Get the command list
 
-        try:
-            # Test
-            process_mkv_file(temp_path)
+        # Should not include audio track options
+        assert "track:a1" not in call_args
 
-            # Verify subprocess was called without audio track options
-            mock_run.assert_called_once()
-            call_args = mock_run.call_args[0][0]  # Get the command list
+        # Should log that no audio tracks were found
+        assert_logged(mkv_mocks.logger, "debug", "No audio tracks found")
 
-            # Should not include audio track options
-            audio_track_present = False
-            for _i, arg in enumerate(call_args):
-                if arg == "track:a1":
-                    audio_track_present = True
-                    break
-
-            assert not audio_track_present
-
-            # Should log that no audio tracks were found
-            mock_logger.debug.assert_called()
-            debug_calls = [call[0][0] for call in mock_logger.debug.call_args_list]
-            assert any("No audio tracks found" in call for call in debug_calls)
-
-        finally:
-            Path(temp_path).unlink()
-
-    @patch("main.options")
-    @patch("main.mkvpropedit", "/usr/bin/mkvpropedit")
-    @patch("main.mkvmerge", "/usr/bin/mkvmerge")
-    @patch("main.subprocess.run")
-    @patch("main.get_mkv_metadata")
-    @patch("main.logger")
-    def test_process_mkv_file_dry_run(
-        self, mock_logger, mock_get_metadata, mock_run, mock_options
-    ):
+    def test_process_mkv_file_dry_run(self, mkv_mocks, monkeypatch, dummy_mkv):
         """Test processing MKV file in dry run mode"""
         # Setup
-        mock_options.dry_run = True
-        mock_options.set_default_sub_track = False
-        mock_options.force_default_first_subtitle = False
-
-        mock_metadata = {"tracks": [{"type": "video"}]}
-        mock_get_metadata.return_value = mock_metadata
+        monkeypatch.setattr(
+            "main.options",
+            MagicMock(
+                dry_run=True,
+                set_default_sub_track=False,
+                force_default_first_subtitle=False,
+            ),
+        )
+        mkv_mocks.get_metadata.return_value = _META_VIDEO
 
-        # Create temp file
-        with tempfile.NamedTemporaryFile(suffix=".mkv", delete=False) as temp_file:
-            temp_file.write(b"fake mkv content")
-            temp_path = temp_file.name
+        process_mkv_file(dummy_mkv)
 
-        try:
-            # Test
-            process_mkv_file(temp_path)
+        # Verify subprocess was NOT called in dry run mode
+        mkv_mocks.run.assert_not_called()
 
-            # Verify subprocess was NOT called in dry run mode
-            mock_run.assert_not_called()
+        # Verify dry run logging
+        assert_logged(mkv_mocks.logger, "info", "DRY RUN")
 
-            # Verify dry run logging
-            mock_logger.info.assert_called()
-            info_calls = [call[0][0] for call in mock_logger.info.call_args_list]
-            assert any("DRY RUN" in call for call in info_calls)
-
-        finally:
-            Path(temp_path).unlink()
-
-    @patch("main.options")
-    @patch("main.mkvpropedit", None)
-    @patch("main.mkvmerge", "/usr/bin/mkvmerge")
-    @patch("main.logger")
-    def test_process_mkv_file_no_mkvpropedit(self, mock_logger, mock_options):
+    def test_process_mkv_file_no_mkvpropedit(self, mkv_mocks, monkeypatch, dummy_mkv):
         """Test processing MKV file when mkvpropedit is not available"""
-        mock_options.dry_run = False
+        monkeypatch.setattr("main.options", MagicMock(dry_run=False))
+        monkeypatch.setattr("main.mkvpropedit", None)
 
-        # Create temp file
-        with tempfile.NamedTemporaryFile(suffix=".mkv", delete=False) as temp_file:
-            temp_file.write(b"fake mkv content")
-            temp_path = temp_file.name
+        result = process_mkv_file(dummy_mkv)
 
-        try:
-            # Test
-            result = process_mkv_file(temp_path)
-
-            # Should return None and log warning
-            assert result is None
-            mock_logger.info.assert_called_with(
-                "mkvpropedit not found in PATH. Skipping."
-            )
-
-        finally:
-            Path(temp_path).unlink()
+        # Should return None and log warning
+        assert result is None
+        mkv_mocks.logger.info.assert_called_with(
+            "mkvpropedit not found in PATH. Skipping."
+        )
 
 
 class TestProcessMp4File:
@@ -185,7 +137,7 @@ class TestProcessMp4File:
     @patch("main.get_mp4_metadata")
     @patch("main.logger")
     def test_process_mp4_file_with_metadata(
-        self, mock_logger, mock_get_metadata, mock_run, mock_options
+        self, mock_logger, mock_get_metadata, mock_run, mock_options, dummy_mp4
     ):
         """Test processing MP4 file with metadata"""
         # Setup
@@ -195,38 +147,60 @@ class TestProcessMp4File:
         mock_get_metadata.return_value = mock_metadata
 
         # Mock successful subprocess calls
-        mock_run.return_value = MagicMock()
+        mock_run.return_value = MagicMock(returncode=0)
+
+        process_mp4_file(dummy_mp4)
 
-        # Create temp file
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_file:
-            temp_file.write(b"fake mp4 content")
-            temp_path = temp_file.name
+        # Verify subprocess was called with correct arguments
+        mock_run.assert_called_once()
+        call_args = mock_run.call_args[0][0]  # Get the command list
 
-        try:
-            # Test
-            process_mp4_file(temp_path)
+        # Should include title and description clearing
+        assert "--title" in call_args
+        assert "--description" in call_args
+        assert "--overWrite" in call_args
 
-            # Verify subprocess was called with correct arguments
-            mock_run.assert_called_once()
-            call_args = mock_run.call_args[0][0]  # Get the command list
+        # Verify logging
+        mock_logger.info.assert_called()
+
+    @patch("main.options")
+    @patch("main.atomicparsley", "/usr/bin/AtomicParsley")
+    @patch("main.subprocess.run")
+    @patch("main.get_mp4_metadata")
+    @patch("main.logger")
+    def test_process_mp4_file_tool_failure(
+        self,
+        mock_logger,
+        mock_get_metadata,
+        mock_run,
+        mock_options,
+        dummy_mp4,
+        monkeypatch,
+    ):
+        """Test a non-zero AtomicParsley exit is counted as an errored file"""
+        mock_options.dry_run = False
+        mock_get_metadata.return_value = {"title": "Test Title", "description": None}
+        mock_run.return_value = MagicMock(returncode=1, stdout="bad mpeg4 file\n")
 
-            # Should include title and description clearing
-            assert "--title" in call_args
-            assert "--description" in call_args
-            assert "--overWrite" in call_args
+        monkeypatch.setattr(main, "files_processed", 0)
+        monkeypatch.setattr(main, "files_errored", 0)
+        monkeypatch.setattr(main, "files_with_errors", [])
 
-            # Verify logging
-            mock_logger.info.assert_called()
+        process_mp4_file(dummy_mp4)
 
-        finally:
-            Path(temp_path).unlink()
+        assert main.files_processed == 0
+        assert main.files_errored == 1
+        assert main.files_with_errors == [dummy_mp4]
+        mock_logger.error.assert_called_once_with(
+            "Error processing file: bad mpeg4 file"
+        )
 
     @patch("main.options")
     @patch("main.atomicparsley", "/usr/bin/AtomicParsley")
     @patch("main.get_mp4_metadata")
     @patch("main.logger")
     def test_process_mp4_file_no_metadata(
-        self, mock_logger, mock_get_metadata, mock_options
+        self, mock_logger, mock_get_metadata, mock_options, dummy_mp4
     ):
         """Test processing MP4 file without metadata"""
         # Setup
@@ -234,177 +208,98 @@ class TestProcessMp4File:
 
         mock_get_metadata.return_value = None
 
-        # Create temp file
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_file:
-            temp_file.write(b"fake mp4 content")
-            temp_path = temp_file.name
+        result = process_mp4_file(dummy_mp4)
 
-        try:
-            # Test
-            result = process_mp4_file(temp_path)
-
-            # Should return None and log that no metadata was found
-            assert result is None
-            mock_logger.info.assert_called_with("No metadata found in file.")
-
-        finally:
-            Path(temp_path).unlink()
+        # Should return None and log that no metadata was found
+        assert result is None
+        mock_logger.info.assert_called_with("No metadata found in file.")
 
     @patch("main.options")
     @patch("main.atomicparsley", None)
     @patch("main.logger")
-    def test_process_mp4_file_no_atomicparsley(self, mock_logger, mock_options):
+    def test_process_mp4_file_no_atomicparsley(
+        self, mock_logger, mock_options, dummy_mp4
+    ):
         """Test processing MP4 file when AtomicParsley is not available"""
         mock_options.dry_run = False
 
-        # Create temp file
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_file:
-            temp_file.write(b"fake mp4 content")
-            temp_path = temp_file.name
-
-        try:
-            # Test
-            result = process_mp4_file(temp_path)
-
-            # Should return None and log warning
-            assert result is None
-            mock_logger.info.assert_called_with(
-                "AtomicParsley not found in PATH. Skipping."
-            )
+        result = process_mp4_file(dummy_mp4)
 
-        finally:
-            Path(temp_path).unlink()
+        # Should return None and log warning
+        assert result is None
+        mock_logger.info.assert_called_with(
+            "AtomicParsley not found in PATH. Skipping."
+        )
 
 
 class TestProcessFolder:
     """Integration tests for folder processing"""
 
-    @patch("main.options")
+    @pytest.mark.parametrize(
+        ("only_mkv", "only_mp4", "expected_mkv", "expected_mp4"),
+        [
+            (False, False, ["test.mkv"], ["test.m4v", "test.mp4"]),
+            (True, False, ["test.mkv"], []),
+            (False, True, [], ["test.m4v", "test.mp4"]),
+        ],
+        ids=["mixed_files", "only_mkv", "only_mp4"],
+    )
     @patch("main.process_mkv_file")
     @patch("main.process_mp4_file")
-    def test_process_folder_mixed_files(
-        self, mock_process_mp4, mock_process_mkv, mock_options
+    def test_process_folder_file_type_filters(
+        self,
+        mock_process_mp4,
+        mock_process_mkv,
+        monkeypatch,
+        tmp_path,
+        only_mkv,
+        only_mp4,
+        expected_mkv,
+        expected_mp4,
     ):
-        """Test processing folder with mixed file types"""
-        # Setup
-        mock_options.only_mkv = False
-        mock_options.only_mp4 = False
-
-        # Create temp directory with test files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test files
-            mkv_file = str(Path(temp_dir) / "test.mkv")
-            mp4_file = str(Path(temp_dir) / "test.mp4")
-            txt_file = str(Path(temp_dir) / "readme.txt")
+        """Test processing folder with mixed file types and file type filters"""
+        monkeypatch.setattr(
+            "main.options", MagicMock(only_mkv=only_mkv, only_mp4=only_mp4)
+        )
 
-            with Path(mkv_file).open("w") as f:
-                f.write("fake mkv")
-            with Path(mp4_file).open("w") as f:
-                f.write("fake mp4")
-            with Path(txt_file).open("w") as f:
-                f.write("text file")
+        # process_folder only lists the files, so empty ones are enough
+        for name in ("test.mkv", "test.mp4", "test.m4v", "readme.txt"):
+            (tmp_path / name).touch()
 
-            # Test
-            process_folder(temp_dir)
+        process_folder(str(tmp_path))
 
-            # Verify both processors were called
-            mock_process_mkv.assert_called_once_with(mkv_file)
-            mock_process_mp4.assert_called_once_with(mp4_file)
-
-    @patch("main.options")
-    @patch("main.process_mkv_file")
-    @patch("main.process_mp4_file")
-    def test_process_folder_only_mkv(
-        self, mock_process_mp4, mock_process_mkv, mock_options
-    ):
-        """Test processing folder with only MKV files enabled"""
-        # Setup
-        mock_options.only_mkv = True
-        mock_options.only_mp4 = False
-
-        # Create temp directory with test files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test files
-            mkv_file = str(Path(temp_dir) / "test.mkv")
-            mp4_file = str(Path(temp_dir) / "test.mp4")
-
-            with Path(mkv_file).open("w") as f:
-                f.write("fake mkv")
-            with Path(mp4_file).open("w") as f:
-                f.write("fake mp4")
-
-            # Test
-            process_folder(temp_dir)
-
-            # Verify only MKV processor was called
-            mock_process_mkv.assert_called_once_with(mkv_file)
-            mock_process_mp4.assert_not_called()
-
-    @patch("main.options")
-    @patch("main.process_mkv_file")
-    @patch("main.process_mp4_file")
-    def test_process_folder_only_mp4(
-        self, mock_process_mp4, mock_process_mkv, mock_options
-    ):
-        """Test processing folder with only MP4 files enabled"""
-        # Setup
-        mock_options.only_mkv = False
-        mock_options.only_mp4 = True
-
-        # Create temp directory with test files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test files
-            mkv_file = str(Path(temp_dir) / "test.mkv")
-            mp4_file = str(Path(temp_dir) / "test.mp4")
-            m4v_file = str(Path(temp_dir) / "test.m4v")
-
-            with Path(mkv_file).open("w") as f:
-                f.write("fake mkv")
-            with Path(mp4_file).open("w") as f:
-                f.write("fake mp4")
-            with Path(m4v_file).open("w") as f:
-                f.write("fake m4v")
-
-            # Test
-            process_folder(temp_dir)
-
-            # Verify only MP4 processors were called
-            mock_process_mkv.assert_not_called()
-            mock_process_mp4.assert_any_call(mp4_file)
-            mock_process_mp4.assert_any_call(m4v_file)
+        # Verify each processor got exactly the files its filter allows
+        assert sorted(c.args[0] for c in mock_process_mkv.call_args_list) == [
+            str(tmp_path / name) for name in expected_mkv
+        ]
+        assert sorted(c.args[0] for c in mock_process_mp4.call_args_list) == [
+            str(tmp_path / name) for name in expected_mp4
+        ]
 
     @patch("main.options")
     @patch("main.process_mkv_file")
     @patch("main.process_mp4_file")
     def test_process_folder_recursive(
-        self, mock_process_mp4, mock_process_mkv, mock_options
+        self, mock_process_mp4, mock_process_mkv, mock_options, tmp_path
     ):
         """Test recursive folder processing"""
         # Setup
         mock_options.only_mkv = False
         mock_options.only_mp4 = False
 
-        # Create temp directory with nested structure
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create nested directory
-            nested_dir = str(Path(temp_dir) / "nested")
-            Path(nested_dir).mkdir(parents=True)
-
-            # Create test files at different levels
-            root_mkv = str(Path(temp_dir) / "root.mkv")
-            nested_mp4 = str(Path(nested_dir) / "nested.mp4")
-
-            with Path(root_mkv).open("w") as f:
-                f.write("fake mkv")
-            with Path(nested_mp4).open("w") as f:
-                f.write("fake mp4")
+        # Create test files at different levels of a nested structure
+        root_mkv = tmp_path / "root.mkv"
+        nested_mp4 = tmp_path / "nested" / "nested.mp4"
+        nested_mp4.parent.mkdir()
+        root_mkv.touch()
+        nested_mp4.touch()
 
-            # Test
-            process_folder(temp_dir)
+        # Test
+        process_folder(str(tmp_path))
 
-            # Verify both files were processed
-            mock_process_mkv.assert_called_once_with(root_mkv)
-            mock_process_mp4.assert_called_once_with(nested_mp4)
+        # Verify both files were processed
+        mock_process_mkv.assert_called_once_with(str(root_mkv))
+        mock_process_mp4.assert_called_once_with(str(nested_mp4))
 
     @patch("main.folders_errored", 0)
     @patch("main.logger")
@@ -3,12 +3,15 @@ Unit tests for main.py functions
 """
 
 import json
+import os
+import struct
 import subprocess
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+import main
 from main import (
     format_error_string,
     get_mkv_metadata,
@@ -22,6 +25,22 @@ from main import (
     read_paths_from_file,
 )
 
+# Leading bytes of a Matroska file, so fake files get past the header check
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+
+def mp4_atom(kind, payload=b""):
+    """Build an MP4 atom with a 32-bit size header"""
+    return struct.pack(">I", 8 + len(payload)) + kind + payload
+
+
+def fake_mp4(*items, first=b"ftyp"):
+    """Build a minimal MP4 file whose metadata list holds the given items"""
+    ilst = mp4_atom(b"ilst", b"".join(mp4_atom(item, b"data") for item in items))
+    meta = mp4_atom(b"meta", b"\0\0\0\0" + mp4_atom(b"hdlr", b"mdir") + ilst)
+    moov = mp4_atom(b"moov", mp4_atom(b"udta", meta))
+    return mp4_atom(first, b"isom") + mp4_atom(b"mdat", b"x" * 32) + moov
+
 
 @pytest.fixture(autouse=True)
 def setup_tools():
@@ -156,6 +175,46 @@ class TestGetMkvMetadata:
         with pytest.raises(json.JSONDecodeError):
             get_mkv_metadata("test.mkv")
 
+    @pytest.mark.skipif(os.name != "posix", reason="posix_spawn is POSIX only")
+    @patch("main.subprocess.run")
+    @patch("main.mkvmerge", "/usr/bin/mkvmerge")
+    def test_get_mkv_metadata_allows_posix_spawn(self, mock_run):
+        """Test mkvmerge is launched with options that let CPython use posix_spawn"""
+        mock_run.return_value = MagicMock(stdout="{}")
+
+        get_mkv_metadata("test.mkv")
+
+        assert mock_run.call_args.kwargs["close_fds"] is False
+
+    @pytest.mark.parametrize("content", [b"", b"This is not a video file"])
+    @patch("main.subprocess.run")
+    @patch("main.mkvmerge", "/usr/bin/mkvmerge")
+    def test_get_mkv_metadata_not_matroska_skips_tool(
+        self, mock_run, content, tmp_path
+    ):
+        """Test files without an EBML header are reported unrecognized directly"""
+        mkv_file = tmp_path / "fake.mkv"
+        mkv_file.write_bytes(content)
+
+        result = get_mkv_metadata(str(mkv_file))
+
+        assert result["container"]["recognized"] is False
+        assert result["tracks"] == []
+        mock_run.assert_not_called()
+
+    @patch("main.subprocess.run")
+    @patch("main.mkvmerge", "/usr/bin/mkvmerge")
+    def test_get_mkv_metadata_reads_stdout_only(self, mock_run):
+        """Test only stdout is piped so the output is read without helper threads"""
+        mock_run.return_value = MagicMock(stdout="{}")
+
+        get_mkv_metadata("test.mkv")
+
+        kwargs = mock_run.call_args.kwargs
+        assert kwargs["stdout"] == subprocess.PIPE
+        assert kwargs["stderr"] == subprocess.DEVNULL
+        assert "capture_output" not in kwargs
+
 
 class TestGetMp4Metadata:
     """Test the get_mp4_metadata function"""
@@ -197,6 +256,55 @@ Other line"""
         assert result == {}
         mock_logger.error.assert_called_once()
 
+    @patch("main.subprocess.run")
+    def test_get_mp4_metadata_without_items_skips_tool(self, mock_run, tmp_path):
+        """Test an MP4 without title or description atoms is answered directly"""
+        mp4_file = tmp_path / "plain.mp4"
+        mp4_file.write_bytes(fake_mp4(b"\xa9too"))
+
+        result = get_mp4_metadata(
+            str(mp4_file), atomicparsley_path="/usr/bin/AtomicParsley"
+        )
+
+        assert result == {"title": None, "description": None}
+        mock_run.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            fake_mp4(b"\xa9too", b"\xa9nam"),
+            fake_mp4(b"desc"),
+            # Valid layouts whose first top-level atom is not ftyp
+            fake_mp4(b"desc", first=b"free"),
+            fake_mp4(b"desc", first=b"wide"),
+            # Not an MP4 at all - AtomicParsley reports it
+            b"This is not an MP4 file",
+            # Atom claiming to be larger than the file
+            mp4_atom(b"ftyp", b"isom") + struct.pack(">I4s", 4096, b"moov"),
+        ],
+        ids=[
+            "title",
+            "description",
+            "free_first",
+            "wide_first",
+            "not_mp4",
+            "bad_atom_size",
+        ],
+    )
+    @patch("main.subprocess.run")
+    def test_get_mp4_metadata_with_items_runs_tool(self, mock_run, content, tmp_path):
+        """Test AtomicParsley still reads files with metadata or an unclear layout"""
+        mp4_file = tmp_path / "tagged.mp4"
+        mp4_file.write_bytes(content)
+        mock_run.return_value = MagicMock(stdout='Atom "desc" contains: Text')
+
+        result = get_mp4_metadata(
+            str(mp4_file), atomicparsley_path="/usr/bin/AtomicParsley"
+        )
+
+        assert result == {"title": None, "description": "Text"}
+        mock_run.assert_called_once()
+
 
 class TestGetMkvSubtitleArgs:
     """Test the get_mkv_subtitle_args function"""
@@ -414,6 +522,25 @@ class TestGetToolVersion:
         assert result is None
 
 
+class TestInitializeTools:
+    """Test the initialize_tools function"""
+
+    @patch("main.find_tool_in_common_locations", side_effect=lambda t: f"/bin/{t}")
+    def test_initialize_tools_looks_up_every_call(self, mock_find):
+        """Test tools without an explicit path are looked up on every call"""
+        initialize_tools(mkvmerge_path="/opt/mkvmerge")
+        assert main.mkvmerge == "/opt/mkvmerge"
+        assert main.mkvpropedit == "/bin/mkvpropedit"
+
+        # A changed lookup (e.g. a patched PATH) is picked up by the next call
+        mock_find.side_effect = lambda t: f"/usr/local/bin/{t}"
+        initialize_tools()
+
+        assert mock_find.call_count == 5
+        assert main.mkvmerge == "/usr/local/bin/mkvmerge"
+        assert main.atomicparsley == "/usr/local/bin/AtomicParsley"
+
+
 class TestReadPathsFromFile:
     """Test the read_paths_from_file function"""
 
@@ -422,13 +549,11 @@ class TestReadPathsFromFile:
         test_file = str(Path(temp_dir) / "paths.txt")
         test_paths = ["path1.mkv", "path2.mp4", "# This is a comment", "", "path3.mkv"]
 
-        with Path(test_file).open("w") as f:
-            f.write("\n".join(test_paths))
+        Path(test_file).write_text("\n".join(test_paths))
 
         # Create dummy files so they exist
         for path in ["path1.mkv", "path2.mp4", "path3.mkv"]:
-            with Path(path).open("w") as f:
-                f.write("")
+            Path(path).write_text("")
 
         try:
             result = read_paths_from_file(test_file)
@@ -454,8 +579,7 @@ class TestReadPathsFromFile:
         """Test handling of non-existent paths in file"""
         test_file = str(Path(temp_dir) / "paths.txt")
 
-        with Path(test_file).open("w") as f:
-            f.write("nonexistent1.mkv\nnonexistent2.mp4\n")
+        Path(test_file).write_text("nonexistent1.mkv\nnonexistent2.mp4\n")
 
         with patch("main.logger") as mock_logger:
             result = read_paths_from_file(test_file)
@@ -468,19 +592,19 @@ class TestReadPathsFromFile:
         """Test handling of DOS line endings"""
         test_file = str(Path(temp_dir) / "paths.txt")
 
-        with Path(test_file).open("wb") as f:
-            f.write(b"path1.mkv\r\npath2.mp4\r\n")
+        Path(test_file).write_bytes(b"path1.mkv\r\npath2.mp4\r\n")
 
         # Create dummy files
-        with Path("path1.mkv").open("w") as f:
-            f.write("")
-        with Path("path2.mp4").open("w") as f:
-            f.write("")
+        Path("path1.mkv").write_text("")
+        Path("path2.mp4").write_text("")
 
         try:
             result = read_paths_from_file(test_file)
 
-            expected = [str(Path("path1.mkv").resolve()), str(Path("path2.mp4").resolve())]
+            expected = [
+                str(Path("path1.mkv").resolve()),
+                str(Path("path2.mp4").resolve()),
+            ]
             assert result == expected
         finally:
             # Clean up
@@ -4,6 +4,7 @@ Tests for remaining main() function edge cases and conditional paths
 
 import os
 import tempfile
+import threading
 from pathlib import Path
 from unittest.mock import patch
 
@@ -326,3 +327,52 @@ class TestMainFunctionEdgeCases:
                 Path(tmp_file_path).unlink()
             # Reset global variables
             main.folders_errored = 0
+
+    @patch("main.sys.exit")
+    @patch("main.logger")
+    @patch("main.process_mp4_file")
+    @patch("main.process_mkv_file")
+    @patch("main.shutil.which", side_effect=lambda tool: f"/usr/bin/{tool}")
+    @patch("main.parse_options")
+    def test_main_function_parallel_jobs(
+        self,
+        mock_parse_options,
+        _mock_which,
+        mock_process_mkv,
+        mock_process_mp4,
+        _mock_logger,
+        mock_exit,
+        tmp_path,
+        monkeypatch,
+    ):
+        """Test main() hands files to a worker pool when jobs is above 1"""
+        monkeypatch.setattr(main, "folders_processed", 0)
+        mkv_file = tmp_path / "movie.mkv"
+        mp4_file = tmp_path / "clip.mp4"
+        mkv_file.write_bytes(b"fake mkv content")
+        mp4_file.write_bytes(b"fake mp4 content")
+
+        mock_parse_options.return_value = create_mock_options(
+            paths=[str(mkv_file), str(tmp_path)], jobs=2
+        )
+
+        # Record which thread processed each file
+        worker_threads = []
+        mock_process_mkv.side_effect = lambda path: worker_threads.append(
+            threading.current_thread()
+        )
+        mock_process_mp4.side_effect = mock_process_mkv.side_effect
+
+        with patch("sys.argv", [__app_name__, str(mkv_file), str(tmp_path)]):
+            main.main()
+
+        # The direct file and both folder files went through the pool
+        assert mock_process_mkv.call_count == 2
+        mock_process_mp4.assert_called_once_with(str(mp4_file))
+        assert len(worker_threads) == 3
+        assert threading.main_thread() not in worker_threads
+
+        # The pool is torn down once the run completes
+        assert main._executor is None
+        assert main._pending == []
+        mock_exit.assert_called_once()
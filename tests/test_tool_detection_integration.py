@@ -174,7 +174,9 @@ class TestToolDetectionIntegration:
 
                         # Mock tool version detection
                         with patch("main.get_tool_version") as mock_get_version:
-                            mock_get_version.return_value = "Tool version 1.2.3"
+                            mock_get_version.side_effect = (
+                                lambda tool: f"{Path(tool).name} v1.2.3"
+                            )
 
                             with patch("main.process_mkv_file") as mock_process_mkv:
                                 with patch("main.logger") as mock_logger:
@@ -197,6 +199,16 @@ class TestToolDetectionIntegration:
                                         mock_logger.debug.assert_any_call(
                                             "  AtomicParsley: /usr/bin/AtomicParsley - PATH"
                                         )
+                                        # Each version is logged next to its tool
+                                        mock_logger.info.assert_any_call(
+                                            "mkvpropedit version: mkvpropedit v1.2.3"
+                                        )
+                                        mock_logger.info.assert_any_call(
+                                            "mkvmerge version: mkvmerge v1.2.3"
+                                        )
+                                        mock_logger.info.assert_any_call(
+                                            "AtomicParsley v1.2.3"
+                                        )
                                         mock_exit.assert_called_once()
         finally:
             # Clean up
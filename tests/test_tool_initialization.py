@@ -81,7 +81,7 @@ class TestToolInitialization:
 
                     # Mock subprocess to avoid actual execution
                     with patch("main.subprocess.run") as mock_subprocess:
-                        mock_subprocess.return_value = MagicMock()
+                        mock_subprocess.return_value = MagicMock(returncode=0)
 
                         # Call the function with subtitle processing enabled
                         process_mkv_file(